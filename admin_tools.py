@@ -17,6 +17,7 @@ import aiofiles
 from config import DB_PATH, BACKUPS_DIR, EXPORTS_DIR, ADMIN_IDS
 from logger import get_logger
 from error_handler import handle_database_errors
+from db_pool import invalidate_tables
 from analytics import analytics_manager
 
 logger = get_logger('admin_tools')
@@ -306,6 +307,7 @@ class BulkActionsManager:
             
             deleted_count = cursor.rowcount
             conn.commit()
+            invalidate_tables('posts', 'comments')
             
             return {
                 "success": True,
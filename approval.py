@@ -5,6 +5,7 @@ from telegram.ext import ContextTypes
 from config import ADMIN_IDS, CHANNEL_ID, BOT_USERNAME, DB_PATH
 from utils import escape_markdown_text
 from db import get_comment_count
+from db_pool import invalidate_tables
 
 # Import ranking system integration
 from ranking_integration import award_points_for_confession_approval, RankingIntegration
@@ -18,6 +19,7 @@ def approve_post(post_id, message_id):
             (message_id, post_id)
         )
         conn.commit()
+    invalidate_tables('posts')
 
 def reject_post(post_id):
     """Reject a post"""
@@ -25,6 +27,7 @@ def reject_post(post_id):
         cursor = conn.cursor()
         cursor.execute("UPDATE posts SET approved=0 WHERE post_id=?", (post_id,))
         conn.commit()
+    invalidate_tables('posts')
 
 def flag_post(post_id):
     """Flag a post for review"""
@@ -32,6 +35,7 @@ def flag_post(post_id):
         cursor = conn.cursor()
         cursor.execute("UPDATE posts SET flagged=1 WHERE post_id=?", (post_id,))
         conn.commit()
+    invalidate_tables('posts')
 
 def block_user(user_id):
     """Block a user"""
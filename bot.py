@@ -3,6 +3,7 @@ Enhanced Telegram Confession Bot with Sophisticated Comment System
 Features: Pagination, Like/Dislike, Replies, Reporting, and Admin Moderation
 """
 
+import asyncio
 import logging
 import re
 import os
@@ -11,6 +12,12 @@ from typing import Optional
 from telegram import Update, ReplyKeyboardMarkup, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
 
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 from config import *
 from db import *
 from submission import *
@@ -680,11 +687,10 @@ async def recent_posts(update: Update, context: ContextTypes.DEFAULT_TYPE):
         keyboard = []
         
         for post in posts:
-            post_id = post[0]
-            content = post[1]
-            category = post[2]
-            # Comment count is the last column from the SQL query
-            comment_count = post[-1] if len(post) > 9 else 0
+            post_id = post['post_id']
+            content = post['content']
+            category = post['category']
+            comment_count = post['comment_count']
             
             preview = truncate_text(content, 100)
             reply += f"\\#{post_id} \\| {escape_markdown_text(category)}\n{escape_markdown_text(preview)}\n\n"
@@ -712,7 +718,7 @@ async def recent_posts(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def show_post_for_commenting(update: Update, context: ContextTypes.DEFAULT_TYPE, post_id: int):
     """Show direct comment interface (from 'Add Comment' deep link)"""
     post = get_post_by_id(post_id)
-    if not post or post[13] != 1:  # Check if approved (approved field is at index 13, value 1 = approved)
+    if not post or post['approved'] != 1:  # Check if approved (value 1 = approved)
         if update.message:
             await update.message.reply_text("❗ Post not found or not available.")
             await show_menu(update, context)
@@ -723,9 +729,9 @@ async def show_post_for_commenting(update: Update, context: ContextTypes.DEFAULT
             )
         return
     
-    content = post[1]
-    category = post[2]
-    comment_count = get_comment_count(post_id)
+    content = post['content']
+    category = post['category']
+    comment_count = post['comment_count']  # Already fetched with the post
     
     context.user_data['comment_post_id'] = post_id
     context.user_data['state'] = 'writing_comment'
@@ -759,9 +765,9 @@ async def show_comments_directly(update: Update, context: ContextTypes.DEFAULT_T
     try:
         logger.info(f"show_comments_directly called with post_id: {post_id}")
         post = get_post_by_id(post_id)
-        logger.info(f"Retrieved post: {post}")
+        logger.info(f"Retrieved post: {tuple(post) if post else None}")
         
-        if not post or post[13] != 1:  # Check if approved (approved field is at index 13, value 1 = approved)
+        if not post or post['approved'] != 1:  # Check if approved (value 1 = approved)
             await update.message.reply_text("❗ Post not found or not available.")
             await show_menu(update, context)
             return
@@ -937,7 +943,7 @@ async def show_post_with_options(update: Update, context: ContextTypes.DEFAULT_T
         await query.answer()
     
     post = get_post_by_id(post_id)
-    if not post or post[13] != 1:  # Check if approved (approved field is at index 13, value 1 = approved)
+    if not post or post['approved'] != 1:  # Check if approved (value 1 = approved)
         message_text = "❗ Post not found or not available."
         if query:
             await query.edit_message_text(message_text)
@@ -945,9 +951,9 @@ async def show_post_with_options(update: Update, context: ContextTypes.DEFAULT_T
             await update.message.reply_text(message_text)
         return
     
-    content = post[1]
-    category = post[2]
-    comment_count = get_comment_count(post_id)
+    content = post['content']
+    category = post['category']
+    comment_count = post['comment_count']  # Already fetched with the post
     
     context.user_data['viewing_post_id'] = post_id
     
@@ -1320,12 +1326,12 @@ async def view_my_confessions_callback(update: Update, context: ContextTypes.DEF
     
     # Send each confession as a separate message
     for post in posts:
-        post_id = post[0]
-        content = post[1]
-        category = post[2]
-        timestamp = post[3]
-        approved = post[4]
-        comment_count = post[5]
+        post_id = post['post_id']
+        content = post['content']
+        category = post['category']
+        timestamp = post['timestamp']
+        approved = post['approved']
+        comment_count = post['comment_count']
         
         status_emoji = "✅" if approved == 1 else "⏳" if approved is None else "❌"
         status_text = "Approved" if approved == 1 else "Pending" if approved is None else "Rejected"
@@ -1542,11 +1548,11 @@ async def daily_digest(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Send each confession as a separate message
     for post in posts:
-        post_id = post[0]
-        content = post[1]
-        category = post[2]
-        timestamp = post[3]
-        comment_count = post[5]
+        post_id = post['post_id']
+        content = post['content']
+        category = post['category']
+        timestamp = post['timestamp']
+        comment_count = post['comment_count']
         
         # Format timestamp
         try:
@@ -2171,13 +2177,13 @@ async def pending_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❗ You are not authorized to use admin commands.")
         return
     
-    pending_posts = get_pending_submissions()
+    pending_posts = get_pending_submissions(limit=5)  # Show first 5 pending posts
     
     if not pending_posts:
         await update.message.reply_text("✅ No pending submissions.")
         return
     
-    for post in pending_posts[:5]:  # Show first 5 pending posts
+    for post in pending_posts:
         post_id, content, category, timestamp, user_id, approved, channel_message_id, flagged, likes = post
         
         admin_text = f"""
@@ -2501,7 +2507,7 @@ async def admin_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Get quick stats
     stats = get_channel_stats()
-    pending_posts = len(get_pending_submissions())
+    pending_posts = count_pending_submissions()
     pending_messages = len(get_pending_messages())
     
     dashboard_text = f"""
@@ -2836,7 +2842,7 @@ async def admin_dashboard_callback(update: Update, context: ContextTypes.DEFAULT
     
     # Get quick stats
     stats = get_channel_stats()
-    pending_posts = len(get_pending_submissions())
+    pending_posts = count_pending_submissions()
     pending_messages = len(get_pending_messages())
     
     dashboard_text = f"""
@@ -3013,7 +3019,7 @@ async def admin_content_management(update: Update, context: ContextTypes.DEFAULT
         return
     
     # Get content stats
-    pending_posts = len(get_pending_submissions())
+    pending_posts = count_pending_submissions()
     
     content_text = f"""
 📝 *Content Management*
@@ -3207,6 +3213,11 @@ async def admin_system_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 def main():
     """Main function to run the bot"""
+    # Use uvloop for the event loop when it is installed
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+    
     # Initialize database
     init_db()
     
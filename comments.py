@@ -3,6 +3,7 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from config import DB_PATH, COMMENTS_PER_PAGE, CHANNEL_ID, BOT_USERNAME
 from utils import escape_markdown_text
 from db import get_comment_count
+from db_pool import invalidate_tables
 
 def save_comment(post_id, content, user_id, parent_comment_id=None):
     """Save a comment to the database"""
@@ -21,6 +22,8 @@ def save_comment(post_id, content, user_id, parent_comment_id=None):
                 (user_id,)
             )
             conn.commit()
+            # The comment_count trigger also changed the post row
+            invalidate_tables('posts', 'comments')
             return comment_id, None
     except Exception as e:
         return None, f"Database error: {str(e)}"
@@ -138,20 +138,4 @@ def is_blocked_user(user_id):
         cursor = conn.cursor()
         cursor.execute('SELECT blocked FROM users WHERE user_id = ?', (user_id,))
         result = cursor.fetchone()
-        return result and result[0] == 1
-
-def get_user_posts(user_id, limit=10):
-    """Get user's posts with status and comment count"""
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT p.post_id, p.content, p.category, p.timestamp, p.approved,
-                   COUNT(c.comment_id) as comment_count
-            FROM posts p
-            LEFT JOIN comments c ON p.post_id = c.post_id
-            WHERE p.user_id = ?
-            GROUP BY p.post_id, p.content, p.category, p.timestamp, p.approved
-            ORDER BY p.timestamp DESC
-            LIMIT ?
-        ''', (user_id, limit))
-        return cursor.fetchall()
\ No newline at end of file
+        return result and result[0] == 1
\ No newline at end of file
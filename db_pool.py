@@ -0,0 +1,185 @@
+"""
+Shared SQLite connection pool and query result cache
+Reuses open connections (and their page caches) instead of reconnecting per query
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from functools import wraps
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+from config import DB_PATH
+from logger import get_logger
+
+logger = get_logger('db_pool')
+
+
+class DatabaseConnectionPool:
+    """Database connection pool for better performance"""
+    
+    def __init__(self, database_path: str, pool_size: int = 10, timeout: float = 30.0):
+        self.database_path = database_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = []
+        self._used_connections = set()
+        self._lock = threading.RLock()
+        self._create_initial_connections()
+    
+    def _create_initial_connections(self):
+        """Create initial connections in the pool"""
+        with self._lock:
+            for _ in range(self.pool_size):
+                conn = self._create_connection()
+                if conn:
+                    self._pool.append(conn)
+    
+    def _create_connection(self) -> Optional[sqlite3.Connection]:
+        """Create a new database connection"""
+        try:
+            conn = sqlite3.connect(
+                self.database_path,
+                timeout=self.timeout,
+                check_same_thread=False,
+                isolation_level=None,  # Autocommit mode for better performance
+                # Query text is fixed per call site, so prepared statements are
+                # reused from the per-connection cache (keyed on the SQL string)
+                cached_statements=256
+            )
+            
+            # WAL for concurrent readers, plus cache settings, applied once per
+            # connection in a single call. The cache fills lazily, so the size
+            # is a ceiling, not an allocation.
+            conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA cache_size=-65536;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA mmap_size=268435456;
+            """)  # 64MB page cache, 256MB memory-mapped I/O
+            
+            # Rows read by column name as well as by position
+            conn.row_factory = sqlite3.Row
+            
+            return conn
+        except Exception as e:
+            logger.error(f"Failed to create database connection: {e}")
+            return None
+    
+    @contextmanager
+    def get_connection(self):
+        """Get a connection from the pool"""
+        conn = None
+        try:
+            with self._lock:
+                if self._pool:
+                    conn = self._pool.pop()
+                    self._used_connections.add(conn)
+                else:
+                    # Create new connection if pool is empty
+                    conn = self._create_connection()
+                    if conn:
+                        self._used_connections.add(conn)
+            
+            if not conn:
+                raise Exception("Could not get database connection")
+            
+            yield conn
+            
+        finally:
+            if conn:
+                try:
+                    # Reset connection state
+                    conn.rollback()
+                    
+                    with self._lock:
+                        self._used_connections.discard(conn)
+                        if len(self._pool) < self.pool_size:
+                            self._pool.append(conn)
+                        else:
+                            conn.close()
+                            
+                except Exception as e:
+                    logger.error(f"Error returning connection to pool: {e}")
+                    try:
+                        conn.close()
+                    except:
+                        pass
+    
+    def close_all_connections(self):
+        """Close all connections in the pool"""
+        with self._lock:
+            # Close pooled connections
+            for conn in self._pool:
+                try:
+                    conn.close()
+                except:
+                    pass
+            self._pool.clear()
+            
+            # Close used connections
+            for conn in list(self._used_connections):
+                try:
+                    conn.close()
+                except:
+                    pass
+            self._used_connections.clear()
+
+
+# Global pool used by the query modules
+pool = DatabaseConnectionPool(DB_PATH)
+
+
+@contextmanager
+def get_ro_conn():
+    """Borrow a pooled connection that refuses writes for the duration"""
+    with pool.get_connection() as conn:
+        conn.execute("PRAGMA query_only=ON")
+        try:
+            yield conn
+        finally:
+            conn.execute("PRAGMA query_only=OFF")
+
+# Query result cache. Every write to a table bumps its generation, and a cached
+# result is only served while the generations it was read under are current.
+QUERY_CACHE_SIZE = 256
+_table_generations: Dict[str, int] = defaultdict(int)
+_query_cache: "OrderedDict[Tuple, Tuple[float, Tuple[int, ...], Any]]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+
+def invalidate_tables(*tables: str):
+    """Mark cached results that read any of these tables as stale"""
+    with _query_cache_lock:
+        for table in tables:
+            _table_generations[table] += 1
+
+
+def cached_query(tables: Tuple[str, ...], ttl: float = 30):
+    """Cache a read function's result until one of its tables is written or ttl expires"""
+    def decorator(func: Callable):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with _query_cache_lock:
+                # Snapshot before querying so a write racing the read leaves the entry stale
+                generations = tuple(_table_generations[table] for table in tables)
+                entry = _query_cache.get(key)
+                if entry and entry[0] > now and entry[1] == generations:
+                    _query_cache.move_to_end(key)
+                    return entry[2]
+            
+            result = func(*args, **kwargs)
+            
+            with _query_cache_lock:
+                _query_cache[key] = (now + ttl, generations, result)
+                _query_cache.move_to_end(key)
+                while len(_query_cache) > QUERY_CACHE_SIZE:
+                    _query_cache.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
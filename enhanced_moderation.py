@@ -39,6 +39,9 @@ class ProfanityFilter:
             '@': 'a', '3': 'e', '1': 'i', '0': 'o', '5': 's',
             '$': 's', '7': 't', '4': 'a', '!': 'i'
         }
+        # Applied in one str.translate pass; every replacement is a letter,
+        # so no substitution can feed another
+        self._substitution_table = str.maketrans(self.substitutions)
         
         # Patterns for detecting masked profanity
         self.patterns = [
@@ -52,8 +55,7 @@ class ProfanityFilter:
         text = text.lower()
         
         # Apply leetspeak substitutions
-        for char, replacement in self.substitutions.items():
-            text = text.replace(char, replacement)
+        text = text.translate(self._substitution_table)
         
         # Remove non-alphanumeric characters except spaces
         text = re.sub(r'[^a-z0-9\s]', '', text)
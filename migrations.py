@@ -311,9 +311,87 @@ class MigrationManager:
                 ALTER TABLE posts ADD COLUMN channel_message_id INTEGER;
                 """,
                 down_sql=""
+            ),
+            
+            # Version 12: Index approved posts per user for ranking milestone checks
+            Migration(
+                version=12,
+                name="add_posts_user_approved_index",
+                up_sql="""
+                CREATE INDEX IF NOT EXISTS idx_posts_user_approved ON posts(user_id, approved);
+                """,
+                down_sql="""
+                DROP INDEX IF EXISTS idx_posts_user_approved;
+                """
+            ),
+            
+            # Version 13: Keep a per-post comment counter instead of counting comments per read
+            Migration(
+                version=13,
+                name="add_posts_comment_count",
+                up_sql="""
+                ALTER TABLE posts ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0;
+                UPDATE posts SET comment_count = (
+                    SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.post_id
+                );
+                CREATE TRIGGER IF NOT EXISTS trg_comments_count_insert AFTER INSERT ON comments
+                BEGIN
+                    UPDATE posts SET comment_count = comment_count + 1 WHERE post_id = NEW.post_id;
+                END;
+                CREATE TRIGGER IF NOT EXISTS trg_comments_count_delete AFTER DELETE ON comments
+                BEGIN
+                    UPDATE posts SET comment_count = comment_count - 1 WHERE post_id = OLD.post_id;
+                END;
+                """,
+                down_sql="""
+                DROP TRIGGER IF EXISTS trg_comments_count_delete;
+                DROP TRIGGER IF EXISTS trg_comments_count_insert;
+                """
+            ),
+            
+            # Version 14: Let a user's post history read in timestamp order without a sort
+            Migration(
+                version=14,
+                name="add_posts_user_timestamp_index",
+                up_sql="""
+                CREATE INDEX IF NOT EXISTS idx_posts_user_timestamp ON posts(user_id, timestamp);
+                """,
+                down_sql="""
+                DROP INDEX IF EXISTS idx_posts_user_timestamp;
+                """
+            ),
+            
+            # Version 15: Count a user's submissions in the database as posts are inserted
+            Migration(
+                version=15,
+                name="add_posts_questions_asked_trigger",
+                up_sql="""
+                CREATE TRIGGER IF NOT EXISTS trg_posts_questions_asked AFTER INSERT ON posts
+                BEGIN
+                    UPDATE users SET questions_asked = questions_asked + 1 WHERE user_id = NEW.user_id;
+                END;
+                """,
+                down_sql="""
+                DROP TRIGGER IF EXISTS trg_posts_questions_asked;
+                """
             )
         ]
     
+    @staticmethod
+    def _split_statements(sql: str) -> List[str]:
+        """Split a migration script into statements, keeping trigger bodies whole"""
+        statements = []
+        pending = ""
+        for part in sql.split(';'):
+            pending += part + ';'
+            # Semicolons inside BEGIN ... END do not end the statement
+            if sqlite3.complete_statement(pending):
+                statement = pending.strip().rstrip(';').strip()
+                if statement:
+                    statements.append(statement)
+                pending = ""
+        return statements
+    
     def get_current_version(self) -> int:
         """Get current database schema version"""
         with sqlite3.connect(self.db_path) as conn:
@@ -345,11 +423,14 @@ class MigrationManager:
                 logger.info(f"Applying migration {migration.version}: {migration.name}")
                 
                 # Execute the up SQL
-                if migration.up_sql.strip():
-                    # Split by semicolon and execute each statement
-                    statements = [stmt.strip() for stmt in migration.up_sql.split(';') if stmt.strip()]
-                    for statement in statements:
+                for statement in self._split_statements(migration.up_sql):
+                    try:
                         cursor.execute(statement)
+                    except sqlite3.OperationalError as e:
+                        # The column may already exist from the base schema
+                        if 'duplicate column name' not in str(e):
+                            raise
+                        logger.info(f"Skipping existing column in migration {migration.version}: {e}")
                 
                 # Record the migration
                 cursor.execute("""
@@ -3,6 +3,7 @@ Notification UI Components for Smart Notifications System
 Handles user interfaces for notification preferences and settings
 """
 
+import asyncio
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
@@ -89,11 +90,12 @@ async def toggle_comment_notifications(update: Update, context: ContextTypes.DEF
     
     if success:
         status = "enabled" if prefs['comment_notifications'] else "disabled"
-        await update.callback_query.answer(f"Comment notifications {status}!")
-        
         # Refresh the settings page
         from notifications import show_notification_settings
-        await show_notification_settings(update, context)
+        await asyncio.gather(
+            update.callback_query.answer(f"Comment notifications {status}!"),
+            show_notification_settings(update, context)
+        )
     else:
         await update.callback_query.answer("❗ Error updating preferences. Please try again.")
 
@@ -110,11 +112,12 @@ async def toggle_daily_digest(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     if success:
         status = "enabled" if prefs['daily_digest'] else "disabled"
-        await update.callback_query.answer(f"Daily digest {status}!")
-        
         # Refresh the settings page
         from notifications import show_notification_settings
-        await show_notification_settings(update, context)
+        await asyncio.gather(
+            update.callback_query.answer(f"Daily digest {status}!"),
+            show_notification_settings(update, context)
+        )
     else:
         await update.callback_query.answer("❗ Error updating preferences. Please try again.")
 
@@ -131,11 +134,12 @@ async def toggle_trending_alerts(update: Update, context: ContextTypes.DEFAULT_T
     
     if success:
         status = "enabled" if prefs['trending_alerts'] else "disabled"
-        await update.callback_query.answer(f"Trending alerts {status}!")
-        
         # Refresh the settings page
         from notifications import show_notification_settings
-        await show_notification_settings(update, context)
+        await asyncio.gather(
+            update.callback_query.answer(f"Trending alerts {status}!"),
+            show_notification_settings(update, context)
+        )
     else:
         await update.callback_query.answer("❗ Error updating preferences. Please try again.")
 
@@ -188,7 +192,7 @@ async def handle_favorite_category_toggle(update: Update, context: ContextTypes.
     user_id = update.effective_user.id
     
     # Extract category index
-    category_index = int(query.data.replace("fav_cat_", ""))
+    category_index = int(query.data.removeprefix("fav_cat_"))
     category = CATEGORIES[category_index]
     
     # Get current preferences
@@ -262,7 +266,7 @@ async def handle_digest_time_selection(update: Update, context: ContextTypes.DEF
     user_id = update.effective_user.id
     
     # Extract time
-    new_time = query.data.replace("digest_time_", "")
+    new_time = query.data.removeprefix("digest_time_")
     
     # Get current preferences
     prefs = get_user_preferences(user_id)
@@ -272,11 +276,12 @@ async def handle_digest_time_selection(update: Update, context: ContextTypes.DEF
     success = update_user_preferences(user_id, prefs)
     
     if success:
-        await query.answer(f"⏰ Digest time set to {new_time}!")
-        
         # Go back to notification settings
         from notifications import show_notification_settings
-        await show_notification_settings(update, context)
+        await asyncio.gather(
+            query.answer(f"⏰ Digest time set to {new_time}!"),
+            show_notification_settings(update, context)
+        )
     else:
         await query.answer("❗ Error updating time. Please try again.")
 
@@ -455,8 +460,10 @@ async def handle_clear_all_categories(update: Update, context: ContextTypes.DEFA
     
     success = update_user_preferences(user_id, prefs)
     if success:
-        await update.callback_query.answer("🗑️ All categories cleared!")
-        await show_category_management(update, context)
+        await asyncio.gather(
+            update.callback_query.answer("🗑️ All categories cleared!"),
+            show_category_management(update, context)
+        )
     else:
         await update.callback_query.answer("❗ Error clearing categories")
 
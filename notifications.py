@@ -6,6 +6,9 @@ Features: Personalized notifications, category subscriptions, trending alerts, d
 import logging
 import sqlite3
 import asyncio
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -90,8 +93,32 @@ class NotificationEngine:
 # Initialize global notification engine
 notification_engine = NotificationEngine()
 
+# Process-local LRU cache of user preferences: user_id -> (expires_at, prefs)
+PREFS_CACHE_SIZE = 5000
+PREFS_CACHE_TTL = 60  # seconds, so out-of-band edits are picked up
+_prefs_cache: "OrderedDict[int, Tuple[float, Dict]]" = OrderedDict()
+
+def _copy_preferences(prefs: Dict) -> Dict:
+    """Return a copy callers can mutate without touching the cached entry"""
+    return {**prefs, 'favorite_categories': list(prefs['favorite_categories'])}
+
+def _cache_preferences(user_id: int, prefs: Dict):
+    """Store preferences in the cache, evicting the least recently used entry"""
+    _prefs_cache[user_id] = (time.monotonic() + PREFS_CACHE_TTL, _copy_preferences(prefs))
+    _prefs_cache.move_to_end(user_id)
+    if len(_prefs_cache) > PREFS_CACHE_SIZE:
+        _prefs_cache.popitem(last=False)
+
 def get_user_preferences(user_id: int) -> Dict:
     """Get user notification preferences"""
+    cached = _prefs_cache.get(user_id)
+    if cached:
+        expires_at, prefs = cached
+        if expires_at > time.monotonic():
+            _prefs_cache.move_to_end(user_id)
+            return _copy_preferences(prefs)
+        del _prefs_cache[user_id]
+    
     with sqlite3.connect(DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -101,7 +128,7 @@ def get_user_preferences(user_id: int) -> Dict:
         ''', (user_id,))
         result = cursor.fetchone()
         
-        logger.info(f"get_user_preferences for user {user_id}: raw result = {result}")
+        logger.debug("get_user_preferences for user %s: raw result = %s", user_id, result)
         
         if result:
             prefs = {
@@ -112,7 +139,8 @@ def get_user_preferences(user_id: int) -> Dict:
                 'digest_time': result[4],
                 'notification_frequency': result[5]
             }
-            logger.info(f"Parsed preferences for user {user_id}: {prefs}")
+            logger.debug("Parsed preferences for user %s: %s", user_id, prefs)
+            _cache_preferences(user_id, prefs)
             return prefs
         else:
             # Create default preferences
@@ -131,19 +159,20 @@ def get_user_preferences(user_id: int) -> Dict:
                 'digest_time': '18:00',
                 'notification_frequency': 'immediate'
             }
-            logger.info(f"Created default preferences for user {user_id}: {default_prefs}")
+            logger.debug("Created default preferences for user %s: %s", user_id, default_prefs)
+            _cache_preferences(user_id, default_prefs)
             return default_prefs
 
 def update_user_preferences(user_id: int, preferences: Dict) -> bool:
     """Update user notification preferences"""
     try:
-        logger.info(f"update_user_preferences called for user {user_id} with preferences: {preferences}")
+        logger.debug("update_user_preferences called for user %s with preferences: %s", user_id, preferences)
         
         with sqlite3.connect(DB_PATH) as conn:
             cursor = conn.cursor()
             
             favorite_categories_str = ','.join(preferences.get('favorite_categories', []))
-            logger.info(f"Favorite categories string to save: '{favorite_categories_str}'")
+            logger.debug("Favorite categories string to save: '%s'", favorite_categories_str)
             
             params = (
                 user_id,
@@ -155,7 +184,7 @@ def update_user_preferences(user_id: int, preferences: Dict) -> bool:
                 preferences.get('notification_frequency', 'immediate'),
                 datetime.now().isoformat()
             )
-            logger.info(f"SQL parameters: {params}")
+            logger.debug("SQL parameters: %s", params)
             
             cursor.execute('''
                 INSERT OR REPLACE INTO notification_preferences 
@@ -170,11 +199,20 @@ def update_user_preferences(user_id: int, preferences: Dict) -> bool:
                 SELECT favorite_categories FROM notification_preferences WHERE user_id = ?
             ''', (user_id,))
             saved_result = cursor.fetchone()
-            logger.info(f"Verified saved favorite_categories: {saved_result[0] if saved_result else 'None'}")
-            
-            return True
+            logger.debug("Verified saved favorite_categories: %s", saved_result[0] if saved_result else None)
+        
+        _cache_preferences(user_id, {
+            'comment_notifications': bool(params[1]),
+            'favorite_categories': favorite_categories_str.split(',') if favorite_categories_str else [],
+            'daily_digest': bool(params[3]),
+            'trending_alerts': bool(params[4]),
+            'digest_time': params[5],
+            'notification_frequency': params[6]
+        })
+        return True
     except Exception as e:
         logger.error(f"Error updating user preferences: {e}")
+        _prefs_cache.pop(user_id, None)
         return False
 
 def subscribe_to_post(user_id: int, post_id: int) -> bool:
@@ -570,7 +608,7 @@ async def handle_notification_callback(update: Update, context: ContextTypes.DEF
     
     # Handle unsubscribe from post
     if data.startswith("unsub_"):
-        post_id = int(data.replace("unsub_", ""))
+        post_id = int(data.removeprefix("unsub_"))
         success = unsubscribe_from_post(user_id, post_id)
         if success:
             await query.answer("🔕 Unsubscribed from this post!")
@@ -714,8 +752,10 @@ async def toggle_comment_notifications(update: Update, context: ContextTypes.DEF
     success = update_user_preferences(user_id, prefs)
     if success:
         status = "enabled" if new_value else "disabled"
-        await query.answer(f"💬 Comment notifications {status}!")
-        await show_notification_settings(update, context)
+        await asyncio.gather(
+            query.answer(f"💬 Comment notifications {status}!"),
+            show_notification_settings(update, context)
+        )
     else:
         await query.answer("❗ Error updating settings. Try again.")
 
@@ -731,8 +771,10 @@ async def toggle_daily_digest(update: Update, context: ContextTypes.DEFAULT_TYPE
     success = update_user_preferences(user_id, prefs)
     if success:
         status = "enabled" if new_value else "disabled"
-        await query.answer(f"📅 Daily digest {status}!")
-        await show_notification_settings(update, context)
+        await asyncio.gather(
+            query.answer(f"📅 Daily digest {status}!"),
+            show_notification_settings(update, context)
+        )
     else:
         await query.answer("❗ Error updating settings. Try again.")
 
@@ -748,11 +790,27 @@ async def toggle_trending_alerts(update: Update, context: ContextTypes.DEFAULT_T
     success = update_user_preferences(user_id, prefs)
     if success:
         status = "enabled" if new_value else "disabled"
-        await query.answer(f"🔥 Trending alerts {status}!")
-        await show_notification_settings(update, context)
+        await asyncio.gather(
+            query.answer(f"🔥 Trending alerts {status}!"),
+            show_notification_settings(update, context)
+        )
     else:
         await query.answer("❗ Error updating settings. Try again.")
 
+# Static MarkdownV2 parts of the category management screen
+CATEGORY_MANAGEMENT_HEADER = (
+    "❤️ *Manage Favorite Categories*\n\n"
+    "Tap categories to add/remove from favorites\\. You can select multiple categories\\!\n\n"
+)
+CATEGORY_MANAGEMENT_FOOTER = "Choose your favorite categories:"
+
+@lru_cache(maxsize=32)
+def _format_selected_favorites(favorites: Tuple[str, ...]) -> str:
+    """Build the escaped "Currently selected" line for a set of favorites"""
+    favorites_text = escape_markdown_text(', '.join(favorites))
+    count_text = escape_markdown_text(f"({len(favorites)})")
+    return f"*Currently selected {count_text}:* {favorites_text}\n\n"
+
 async def show_category_management(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show favorite categories management interface"""
     query = update.callback_query
@@ -760,20 +818,16 @@ async def show_category_management(update: Update, context: ContextTypes.DEFAULT
     prefs = get_user_preferences(user_id)
     
     current_favorites = prefs['favorite_categories']
-    logger.info(f"show_category_management: user={user_id}, current_favorites={current_favorites}")
+    favorite_set = set(current_favorites)
+    logger.debug("show_category_management: user=%s, current_favorites=%s", user_id, current_favorites)
     
-    categories_text = "❤️ *Manage Favorite Categories*\n\n"
-    categories_text += "Tap categories to add/remove from favorites\\. You can select multiple categories\\!\n\n"
-    
-    # Show currently selected favorites
+    # Only the "currently selected" line varies between renders
     if current_favorites:
-        favorites_text = escape_markdown_text(', '.join(current_favorites))
-        count_text = escape_markdown_text(f"({len(current_favorites)})")
-        categories_text += f"*Currently selected {count_text}:* {favorites_text}\n\n"
+        selected_text = _format_selected_favorites(tuple(current_favorites))
     else:
-        categories_text += "*No favorites selected yet\\.*\n\n"
+        selected_text = "*No favorites selected yet\\.*\n\n"
     
-    categories_text += "Choose your favorite categories:"
+    categories_text = f"{CATEGORY_MANAGEMENT_HEADER}{selected_text}{CATEGORY_MANAGEMENT_FOOTER}"
     
     keyboard = []
     
@@ -783,10 +837,10 @@ async def show_category_management(update: Update, context: ContextTypes.DEFAULT
         
         # First category
         cat1 = CATEGORIES[i]
-        is_favorite1 = cat1 in current_favorites
+        is_favorite1 = cat1 in favorite_set
         emoji1 = "✅" if is_favorite1 else "⬜"
         button_text1 = f"{emoji1} {cat1}"
-        logger.info(f"Button {i}: {button_text1}, is_favorite={is_favorite1}")
+        logger.debug("Button %d: %s, is_favorite=%s", i, button_text1, is_favorite1)
         row.append(InlineKeyboardButton(
             button_text1, 
             callback_data=f"cat_toggle_{i}"
@@ -795,10 +849,10 @@ async def show_category_management(update: Update, context: ContextTypes.DEFAULT
         # Second category (if exists)
         if i + 1 < len(CATEGORIES):
             cat2 = CATEGORIES[i + 1]
-            is_favorite2 = cat2 in current_favorites
+            is_favorite2 = cat2 in favorite_set
             emoji2 = "✅" if is_favorite2 else "⬜"
             button_text2 = f"{emoji2} {cat2}"
-            logger.info(f"Button {i+1}: {button_text2}, is_favorite={is_favorite2}")
+            logger.debug("Button %d: %s, is_favorite=%s", i + 1, button_text2, is_favorite2)
             row.append(InlineKeyboardButton(
                 button_text2, 
                 callback_data=f"cat_toggle_{i + 1}"
@@ -817,8 +871,7 @@ async def show_category_management(update: Update, context: ContextTypes.DEFAULT
     
     reply_markup = InlineKeyboardMarkup(keyboard)
     
-    logger.info(f"About to edit message text. Text length: {len(categories_text)}")
-    logger.info(f"Message text: {categories_text}")
+    logger.debug("About to edit message text. Text length: %d", len(categories_text))
     
     try:
         await query.edit_message_text(
@@ -826,7 +879,7 @@ async def show_category_management(update: Update, context: ContextTypes.DEFAULT
             reply_markup=reply_markup,
             parse_mode="MarkdownV2"
         )
-        logger.info("Successfully edited message with updated keyboard")
+        logger.debug("Successfully edited message with updated keyboard")
     except Exception as e:
         logger.error(f"Error editing message: {e}")
 
@@ -836,35 +889,37 @@ async def toggle_favorite_category(update: Update, context: ContextTypes.DEFAULT
     user_id = update.effective_user.id
     
     # Extract category index from callback data
-    category_index = int(query.data.replace("cat_toggle_", ""))
+    category_index = int(query.data.removeprefix("cat_toggle_"))
     category = CATEGORIES[category_index]
     
     # Debug logging
-    logger.info(f"Toggle category: user={user_id}, category_index={category_index}, category={category}")
+    logger.debug("Toggle category: user=%s, category_index=%d, category=%s", user_id, category_index, category)
     
     prefs = get_user_preferences(user_id)
-    current_favorites = prefs['favorite_categories'].copy()  # Make a copy to ensure we're working with a fresh list
+    current_favorites = prefs['favorite_categories']  # get_user_preferences returns a fresh list
     
-    logger.info(f"Current favorites before toggle: {current_favorites}")
+    logger.debug("Current favorites before toggle: %s", current_favorites)
     
     if category in current_favorites:
         current_favorites.remove(category)
-        await query.answer(f"💔 Removed {category} from favorites")
+        answer_text = f"💔 Removed {category} from favorites"
         action = "removed"
     else:
         current_favorites.append(category)
-        await query.answer(f"💚 Added {category} to favorites")
+        answer_text = f"💚 Added {category} to favorites"
         action = "added"
     
-    logger.info(f"Current favorites after toggle: {current_favorites}, action: {action}")
+    logger.debug("Current favorites after toggle: %s, action: %s", current_favorites, action)
     
-    prefs['favorite_categories'] = current_favorites
     success = update_user_preferences(user_id, prefs)
     
-    logger.info(f"Update preferences success: {success}")
+    logger.debug("Update preferences success: %s", success)
     
     if success:
-        await show_category_management(update, context)
+        await asyncio.gather(
+            query.answer(answer_text),
+            show_category_management(update, context)
+        )
     else:
         await query.answer("❗ Error updating preferences")
 
@@ -919,7 +974,7 @@ async def set_digest_time(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     
     # Extract time from callback data
-    time_str = query.data.replace("set_time_", "")
+    time_str = query.data.removeprefix("set_time_")
     new_time = f"{time_str[:2]}:{time_str[2:]}"
     
     prefs = get_user_preferences(user_id)
@@ -927,8 +982,10 @@ async def set_digest_time(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     success = update_user_preferences(user_id, prefs)
     if success:
-        await query.answer(f"⏰ Digest time set to {new_time}!")
-        await show_notification_settings(update, context)
+        await asyncio.gather(
+            query.answer(f"⏰ Digest time set to {new_time}!"),
+            show_notification_settings(update, context)
+        )
     else:
         await query.answer("❗ Error updating digest time")
 
@@ -1004,8 +1061,10 @@ async def select_all_categories(update: Update, context: ContextTypes.DEFAULT_TY
     
     success = update_user_preferences(user_id, prefs)
     if success:
-        await query.answer(f"✨ Selected all {len(CATEGORIES)} categories!")
-        await show_category_management(update, context)
+        await asyncio.gather(
+            query.answer(f"✨ Selected all {len(CATEGORIES)} categories!"),
+            show_category_management(update, context)
+        )
     else:
         await query.answer("❗ Error updating preferences")
 
@@ -1019,8 +1078,10 @@ async def clear_all_categories(update: Update, context: ContextTypes.DEFAULT_TYP
     
     success = update_user_preferences(user_id, prefs)
     if success:
-        await query.answer("🗳️ Cleared all favorites!")
-        await show_category_management(update, context)
+        await asyncio.gather(
+            query.answer("🗳️ Cleared all favorites!"),
+            show_category_management(update, context)
+        )
     else:
         await query.answer("❗ Error updating preferences")
 
@@ -3,7 +3,6 @@ Performance optimizations for the confession bot
 """
 
 import sqlite3
-import threading
 import time
 import asyncio
 from typing import Dict, Any, Optional, Callable, List, Tuple
@@ -12,7 +11,6 @@ from datetime import datetime, timedelta
 import json
 import psutil
 import gc
-from contextlib import contextmanager
 
 try:
     import redis
@@ -24,114 +22,11 @@ from config import (
     DB_PATH, REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_URL
 )
 from logger import get_logger
+from db_pool import DatabaseConnectionPool, pool as db_pool
 
 logger = get_logger('performance')
 
 
-class DatabaseConnectionPool:
-    """Database connection pool for better performance"""
-    
-    def __init__(self, database_path: str, pool_size: int = 10, timeout: float = 30.0):
-        self.database_path = database_path
-        self.pool_size = pool_size
-        self.timeout = timeout
-        self._pool = []
-        self._used_connections = set()
-        self._lock = threading.RLock()
-        self._create_initial_connections()
-    
-    def _create_initial_connections(self):
-        """Create initial connections in the pool"""
-        with self._lock:
-            for _ in range(self.pool_size):
-                conn = self._create_connection()
-                if conn:
-                    self._pool.append(conn)
-    
-    def _create_connection(self) -> Optional[sqlite3.Connection]:
-        """Create a new database connection"""
-        try:
-            conn = sqlite3.connect(
-                self.database_path,
-                timeout=self.timeout,
-                check_same_thread=False,
-                isolation_level=None  # Autocommit mode for better performance
-            )
-            
-            # Enable WAL mode for better concurrent access
-            conn.execute("PRAGMA journal_mode=WAL")
-            
-            # Optimize SQLite settings
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA cache_size=10000")  # 10MB cache
-            conn.execute("PRAGMA temp_store=MEMORY")
-            conn.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped I/O
-            
-            return conn
-        except Exception as e:
-            logger.error(f"Failed to create database connection: {e}")
-            return None
-    
-    @contextmanager
-    def get_connection(self):
-        """Get a connection from the pool"""
-        conn = None
-        try:
-            with self._lock:
-                if self._pool:
-                    conn = self._pool.pop()
-                    self._used_connections.add(conn)
-                else:
-                    # Create new connection if pool is empty
-                    conn = self._create_connection()
-                    if conn:
-                        self._used_connections.add(conn)
-            
-            if not conn:
-                raise Exception("Could not get database connection")
-            
-            yield conn
-            
-        finally:
-            if conn:
-                try:
-                    # Reset connection state
-                    conn.rollback()
-                    
-                    with self._lock:
-                        self._used_connections.discard(conn)
-                        if len(self._pool) < self.pool_size:
-                            self._pool.append(conn)
-                        else:
-                            conn.close()
-                            
-                except Exception as e:
-                    logger.error(f"Error returning connection to pool: {e}")
-                    try:
-                        conn.close()
-                    except:
-                        pass
-    
-    def close_all_connections(self):
-        """Close all connections in the pool"""
-        with self._lock:
-            # Close pooled connections
-            for conn in self._pool:
-                try:
-                    conn.close()
-                except:
-                    pass
-            self._pool.clear()
-            
-            # Close used connections
-            for conn in list(self._used_connections):
-                try:
-                    conn.close()
-                except:
-                    pass
-            self._used_connections.clear()
-
-
 class CacheManager:
     """Cache manager with Redis and in-memory fallback"""
     
@@ -644,8 +539,7 @@ class MemoryManager:
             return {'error': str(e)}
 
 
-# Global instances
-db_pool = DatabaseConnectionPool(DB_PATH)
+# Global instances (db_pool is the shared pool from db_pool.py)
 cache_manager = CacheManager()
 query_optimizer = QueryOptimizer(cache_manager)
 performance_monitor = PerformanceMonitor()
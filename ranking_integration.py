@@ -3,311 +3,287 @@ Integration layer for ranking system with existing bot functionality
 Connects point awards to user actions throughout the bot
 """
 
+import sqlite3
+from functools import wraps
 from telegram import Update
 from telegram.ext import ContextTypes
 from typing import Optional
 
 from ranking_system import ranking_manager
-from ranking_ui import notify_rank_up, notify_achievement_earned, show_ranking_menu
+from ranking_ui import notify_rank_up, notify_achievement_earned, show_ranking_menu, invalidate_user_cache
 from logger import get_logger
-from config import ADMIN_IDS
+from config import ADMIN_IDS, DB_PATH
 
 logger = get_logger('ranking_integration')
 
+def _log_errors(action: str):
+    """Log and swallow any exception raised by a ranking event handler"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error {action}: {e}")
+        return wrapper
+    return decorator
+
+def _award_points(user_id: int, activity_type: str, **kwargs):
+    """Award points and drop the user's cached rank screens so they show the new total"""
+    success, points = ranking_manager.award_points(user_id=user_id, activity_type=activity_type, **kwargs)
+    if success:
+        invalidate_user_cache(user_id)
+    return success, points
+
 class RankingIntegration:
     """Integrates ranking system with existing bot features"""
     
     @staticmethod
+    @_log_errors("awarding points for confession submission")
     async def handle_confession_submitted(user_id: int, post_id: int, category: str, context: ContextTypes.DEFAULT_TYPE):
         """Handle points when confession is submitted"""
-        try:
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type='confession_submitted',
-                reference_id=post_id,
-                reference_type='confession',
-                description=f"Submitted confession in {category}"
-            )
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type='confession_submitted',
+            reference_id=post_id,
+            reference_type='confession',
+            description=f"Submitted confession in {category}"
+        )
+        
+        if success:
+            logger.info(f"Awarded {points} points to user {user_id} for confession submission")
             
-            if success:
-                logger.info(f"Awarded {points} points to user {user_id} for confession submission")
-                
-                # Check if this is their first confession
-                await RankingIntegration.check_first_time_achievements(user_id, 'confession', context)
-                
-        except Exception as e:
-            logger.error(f"Error awarding points for confession submission: {e}")
+            # Check if this is their first confession
+            await RankingIntegration.check_first_time_achievements(user_id, 'confession', context)
     
     @staticmethod
+    @_log_errors("awarding points for confession approval")
     async def handle_confession_approved(user_id: int, post_id: int, admin_id: int, context: ContextTypes.DEFAULT_TYPE):
         """Handle points when confession is approved"""
-        try:
-            # Award points to user
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type='confession_approved',
-                reference_id=post_id,
-                reference_type='confession',
-                description="Confession approved by admin"
-            )
+        # Award points to user
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type='confession_approved',
+            reference_id=post_id,
+            reference_type='confession',
+            description="Confession approved by admin"
+        )
+        
+        if success:
+            logger.info(f"Awarded {points} points to user {user_id} for approved confession")
             
-            if success:
-                logger.info(f"Awarded {points} points to user {user_id} for approved confession")
-                
-                # Check for rank up and notify user
-                await RankingIntegration.check_and_notify_rank_up(user_id, context)
-                
-                # Daily login bonus (if they haven't been active today)
-                await RankingIntegration.award_daily_login_bonus(user_id)
-                
-        except Exception as e:
-            logger.error(f"Error awarding points for confession approval: {e}")
+            # Check for rank up and notify user
+            await RankingIntegration.check_and_notify_rank_up(user_id, context)
+            
+            # Daily login bonus (if they haven't been active today)
+            await RankingIntegration.award_daily_login_bonus(user_id)
     
     @staticmethod
+    @_log_errors("deducting points for confession rejection")
     async def handle_confession_rejected(user_id: int, post_id: int, admin_id: int):
         """Handle points when confession is rejected"""
-        try:
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type='content_rejected',
-                reference_id=post_id,
-                reference_type='confession',
-                description="Confession rejected by admin"
-            )
-            
-            if success:
-                logger.info(f"Deducted {abs(points)} points from user {user_id} for rejected confession")
-                
-        except Exception as e:
-            logger.error(f"Error deducting points for confession rejection: {e}")
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type='content_rejected',
+            reference_id=post_id,
+            reference_type='confession',
+            description="Confession rejected by admin"
+        )
+        
+        if success:
+            logger.info(f"Deducted {abs(points)} points from user {user_id} for rejected confession")
     
     @staticmethod
+    @_log_errors("awarding points for comment")
     async def handle_comment_posted(user_id: int, post_id: int, comment_id: int, content: str, context: ContextTypes.DEFAULT_TYPE):
         """Handle points when comment is posted"""
-        try:
-            # Base comment points
-            activity_type = 'comment_posted'
-            
-            # Check if it's a quality comment (longer, thoughtful)
-            if len(content) > 100:
-                activity_type = 'quality_comment'
+        # Base comment points
+        activity_type = 'comment_posted'
+        
+        # Check if it's a quality comment (longer, thoughtful)
+        if len(content) > 100:
+            activity_type = 'quality_comment'
+        
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type=activity_type,
+            reference_id=comment_id,
+            reference_type='comment',
+            comment_length=len(content),
+            description=f"Posted comment on confession {post_id}"
+        )
+        
+        if success:
+            logger.info(f"Awarded {points} points to user {user_id} for comment")
             
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type=activity_type,
-                reference_id=comment_id,
-                reference_type='comment',
-                comment_length=len(content),
-                description=f"Posted comment on confession {post_id}"
-            )
+            # Check if this is their first comment
+            await RankingIntegration.check_first_time_achievements(user_id, 'comment', context)
             
-            if success:
-                logger.info(f"Awarded {points} points to user {user_id} for comment")
-                
-                # Check if this is their first comment
-                await RankingIntegration.check_first_time_achievements(user_id, 'comment', context)
-                
-                # Check for rank up
-                await RankingIntegration.check_and_notify_rank_up(user_id, context)
-                
-        except Exception as e:
-            logger.error(f"Error awarding points for comment: {e}")
+            # Check for rank up
+            await RankingIntegration.check_and_notify_rank_up(user_id, context)
     
     @staticmethod
+    @_log_errors("awarding points for reaction")
     async def handle_reaction_given(user_id: int, target_id: int, target_type: str, reaction_type: str):
         """Handle points when user gives a reaction"""
-        try:
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type='reaction_given',
-                reference_id=target_id,
-                reference_type=target_type,
-                description=f"Gave {reaction_type} reaction to {target_type}"
-            )
-            
-            if success:
-                logger.info(f"Awarded {points} points to user {user_id} for reaction")
-                
-        except Exception as e:
-            logger.error(f"Error awarding points for reaction: {e}")
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type='reaction_given',
+            reference_id=target_id,
+            reference_type=target_type,
+            description=f"Gave {reaction_type} reaction to {target_type}"
+        )
+        
+        if success:
+            logger.info(f"Awarded {points} points to user {user_id} for reaction")
     
     @staticmethod
+    @_log_errors("awarding points for received reaction")
     async def handle_reaction_received(user_id: int, target_id: int, target_type: str, reaction_type: str, context: ContextTypes.DEFAULT_TYPE):
         """Handle points when user receives a reaction on their content"""
-        try:
-            activity_type = 'confession_liked' if target_type == 'confession' else 'comment_liked'
+        activity_type = 'confession_liked' if target_type == 'confession' else 'comment_liked'
+        
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type=activity_type,
+            reference_id=target_id,
+            reference_type=target_type,
+            description=f"Received {reaction_type} on {target_type}"
+        )
+        
+        if success:
+            logger.info(f"Awarded {points} points to user {user_id} for receiving reaction")
             
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type=activity_type,
-                reference_id=target_id,
-                reference_type=target_type,
-                description=f"Received {reaction_type} on {target_type}"
-            )
-            
-            if success:
-                logger.info(f"Awarded {points} points to user {user_id} for receiving reaction")
-                
-                # Check for viral post achievements
-                if target_type == 'confession':
-                    await RankingIntegration.check_viral_achievements(user_id, target_id, context)
-                
-        except Exception as e:
-            logger.error(f"Error awarding points for received reaction: {e}")
+            # Check for viral post achievements
+            if target_type == 'confession':
+                await RankingIntegration.check_viral_achievements(user_id, target_id, context)
     
     @staticmethod
+    @_log_errors("deducting points for spam")
     async def handle_spam_detected(user_id: int, content_id: int, content_type: str):
         """Handle point deduction for spam"""
-        try:
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type='spam_detected',
-                reference_id=content_id,
-                reference_type=content_type,
-                description=f"Spam detected in {content_type}"
-            )
-            
-            if success:
-                logger.info(f"Deducted {abs(points)} points from user {user_id} for spam")
-                
-        except Exception as e:
-            logger.error(f"Error deducting points for spam: {e}")
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type='spam_detected',
+            reference_id=content_id,
+            reference_type=content_type,
+            description=f"Spam detected in {content_type}"
+        )
+        
+        if success:
+            logger.info(f"Deducted {abs(points)} points from user {user_id} for spam")
     
     @staticmethod
+    @_log_errors("deducting points for inappropriate content")
     async def handle_inappropriate_content(user_id: int, content_id: int, content_type: str):
         """Handle point deduction for inappropriate content"""
-        try:
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type='inappropriate_content',
-                reference_id=content_id,
-                reference_type=content_type,
-                description=f"Inappropriate content in {content_type}"
-            )
-            
-            if success:
-                logger.info(f"Deducted {abs(points)} points from user {user_id} for inappropriate content")
-                
-        except Exception as e:
-            logger.error(f"Error deducting points for inappropriate content: {e}")
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type='inappropriate_content',
+            reference_id=content_id,
+            reference_type=content_type,
+            description=f"Inappropriate content in {content_type}"
+        )
+        
+        if success:
+            logger.info(f"Deducted {abs(points)} points from user {user_id} for inappropriate content")
     
     @staticmethod
+    @_log_errors("checking first-time achievements")
     async def check_first_time_achievements(user_id: int, activity_type: str, context: ContextTypes.DEFAULT_TYPE):
         """Check and award first-time achievements"""
-        try:
-            # This will be handled automatically by the achievement system
-            # but we can add special notifications here
-            pass
-            
-        except Exception as e:
-            logger.error(f"Error checking first-time achievements: {e}")
+        # This will be handled automatically by the achievement system
+        # but we can add special notifications here
+        pass
     
     @staticmethod
+    @_log_errors("checking viral achievements")
     async def check_viral_achievements(user_id: int, post_id: int, context: ContextTypes.DEFAULT_TYPE):
         """Check for viral post achievements based on likes"""
-        try:
-            import sqlite3
-            from config import DB_PATH
+        with sqlite3.connect(DB_PATH) as conn:
+            cursor = conn.cursor()
+            # Get total likes for this post (assuming you have a likes system)
+            cursor.execute("""
+                SELECT COUNT(*) FROM reactions 
+                WHERE target_id = ? AND target_type = 'post' AND reaction_type = 'like'
+            """, (post_id,))
             
-            with sqlite3.connect(DB_PATH) as conn:
-                cursor = conn.cursor()
-                # Get total likes for this post (assuming you have a likes system)
-                cursor.execute("""
-                    SELECT COUNT(*) FROM reactions 
-                    WHERE target_id = ? AND target_type = 'post' AND reaction_type = 'like'
-                """, (post_id,))
-                
-                like_count = cursor.fetchone()[0]
+            like_count = cursor.fetchone()[0]
+            
+            # Check for viral achievements
+            if like_count >= 100:
+                success, points = _award_points(
+                    user_id=user_id,
+                    activity_type='confession_100_likes',
+                    reference_id=post_id,
+                    reference_type='confession',
+                    like_count=like_count,
+                    description=f"Confession reached {like_count} likes"
+                )
                 
-                # Check for viral achievements
-                if like_count >= 100:
-                    success, points = ranking_manager.award_points(
-                        user_id=user_id,
-                        activity_type='confession_100_likes',
-                        reference_id=post_id,
-                        reference_type='confession',
-                        like_count=like_count,
-                        description=f"Confession reached {like_count} likes"
+                if success:
+                    # Notify about viral achievement
+                    await notify_achievement_earned(
+                        context,
+                        user_id,
+                        "🔥 Viral Post",
+                        f"Your confession got {like_count}+ likes!",
+                        points
                     )
-                    
-                    if success:
-                        # Notify about viral achievement
-                        await notify_achievement_earned(
-                            context,
-                            user_id,
-                            "🔥 Viral Post",
-                            f"Your confession got {like_count}+ likes!",
-                            points
-                        )
-                
-        except Exception as e:
-            logger.error(f"Error checking viral achievements: {e}")
     
     @staticmethod
+    @_log_errors("checking rank up")
     async def check_and_notify_rank_up(user_id: int, context: ContextTypes.DEFAULT_TYPE):
         """Check if user ranked up and notify them"""
-        try:
-            user_rank = ranking_manager.get_user_rank(user_id)
-            if not user_rank:
-                return
-                
-            # Check rank history to see if they just ranked up
-            import sqlite3
-            from config import DB_PATH
-            
-            with sqlite3.connect(DB_PATH) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT new_rank_id, rd.rank_name, rd.rank_emoji
-                    FROM rank_history rh
-                    JOIN rank_definitions rd ON rh.new_rank_id = rd.rank_id
-                    WHERE rh.user_id = ?
-                    ORDER BY rh.created_at DESC
+        # Fetch the current rank and the latest rank change in one round trip
+        with sqlite3.connect(DB_PATH) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT ur.current_rank_id, rh.new_rank_id, rd.rank_name, rd.rank_emoji
+                FROM user_rankings ur
+                LEFT JOIN rank_history rh ON rh.history_id = (
+                    SELECT history_id FROM rank_history
+                    WHERE user_id = ur.user_id
+                    ORDER BY created_at DESC, history_id DESC
                     LIMIT 1
-                """, (user_id,))
-                
-                result = cursor.fetchone()
-                if result:
-                    new_rank_id, rank_name, rank_emoji = result
-                    if new_rank_id == user_rank.current_rank_id:
-                        # They just ranked up, notify them
-                        await notify_rank_up(context, user_id, rank_name, rank_emoji)
-                
-        except Exception as e:
-            logger.error(f"Error checking rank up: {e}")
+                )
+                LEFT JOIN rank_definitions rd ON rd.rank_id = rh.new_rank_id
+                WHERE ur.user_id = ?
+            """, (user_id,))
+            
+            result = cursor.fetchone()
+            if result:
+                current_rank_id, new_rank_id, rank_name, rank_emoji = result
+                if new_rank_id is not None and new_rank_id == current_rank_id:
+                    # They just ranked up, notify them
+                    await notify_rank_up(context, user_id, rank_name, rank_emoji)
     
     @staticmethod
+    @_log_errors("awarding daily login bonus")
     async def award_daily_login_bonus(user_id: int):
         """Award daily login bonus if user hasn't been active today"""
-        try:
-            success, points = ranking_manager.award_points(
-                user_id=user_id,
-                activity_type='daily_login',
-                description="Daily login bonus"
-            )
-            
-            if success and points > 0:
-                logger.info(f"Awarded daily login bonus to user {user_id}")
-                
-        except Exception as e:
-            logger.error(f"Error awarding daily login bonus: {e}")
+        success, points = _award_points(
+            user_id=user_id,
+            activity_type='daily_login',
+            description="Daily login bonus"
+        )
+        
+        if success and points > 0:
+            logger.info(f"Awarded daily login bonus to user {user_id}")
     
     @staticmethod
+    @_log_errors("awarding admin points")
     async def handle_admin_action(admin_id: int, action_type: str, target_user_id: Optional[int] = None):
         """Handle admin actions (optional - admins could also earn points)"""
-        try:
-            if admin_id in ADMIN_IDS and action_type in ['approve_post', 'moderate_content']:
-                success, points = ranking_manager.award_points(
-                    user_id=admin_id,
-                    activity_type='community_contribution',
-                    description=f"Admin action: {action_type}"
-                )
-                
-                if success:
-                    logger.info(f"Awarded {points} points to admin {admin_id} for {action_type}")
-                    
-        except Exception as e:
-            logger.error(f"Error awarding admin points: {e}")
+        if admin_id in ADMIN_IDS and action_type in ['approve_post', 'moderate_content']:
+            success, points = _award_points(
+                user_id=admin_id,
+                activity_type='community_contribution',
+                description=f"Admin action: {action_type}"
+            )
+            
+            if success:
+                logger.info(f"Awarded {points} points to admin {admin_id} for {action_type}")
 
 # Convenience functions for easy integration
 async def award_points_for_confession_submission(user_id: int, post_id: int, category: str, context: ContextTypes.DEFAULT_TYPE):
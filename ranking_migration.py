@@ -4,172 +4,452 @@ Adds tables for points, ranks, achievements, and leaderboards
 """
 
 import sqlite3
+import json
+from datetime import datetime, timedelta, timezone
+from enum import IntFlag
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from config import DB_PATH
 from logger import get_logger
 
 logger = get_logger('ranking_migration')
 
-def create_ranking_tables():
-    """Create all ranking system tables"""
+def _tune_connection(conn: sqlite3.Connection):
+    """Apply write-friendly, in-memory pragmas to a migration connection"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA journal_size_limit=67108864")  # Cap WAL file at 64MB
+    conn.execute("PRAGMA cache_size=-20000")  # 20MB page cache
+    conn.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped I/O
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+def _ensure_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> List[str]:
+    """Add any missing columns to an existing table and return the ones added"""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    added = []
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            added.append(name)
+    return added
+
+# Columns added to existing tables after their first release
+UPGRADE_COLUMNS = {
+    'rank_definitions': {
+        'daily_confessions': 'INTEGER',
+        'priority_review': 'INTEGER DEFAULT 0',
+        'featured_chance': 'REAL DEFAULT 0.0',
+        'perks_mask': 'INTEGER DEFAULT 0',
+    },
+    'user_rankings': {
+        'total_confessions': 'INTEGER DEFAULT 0',
+        'total_comments': 'INTEGER DEFAULT 0',
+        'last_activity_day': 'INTEGER',
+    },
+}
+
+# Activity counter column -> (core table, correlated count used to seed it)
+COUNTER_BACKFILL = {
+    'total_confessions': (
+        'posts',
+        "SELECT COUNT(*) FROM posts WHERE posts.user_id = user_rankings.user_id AND posts.approved = 1",
+    ),
+    'total_comments': (
+        'comments',
+        "SELECT COUNT(*) FROM comments WHERE comments.user_id = user_rankings.user_id",
+    ),
+}
+
+class Perk(IntFlag):
+    """Boolean rank perks, stored together in rank_definitions.perks_mask"""
+    PRIORITY_REVIEW = 1 << 0
+    COMMENT_HIGHLIGHT = 1 << 1
+    EXCLUSIVE_CATEGORIES = 1 << 2
+    CUSTOM_EMOJI = 1 << 3
+    LEGEND_BADGE = 1 << 4
+    UNLIMITED_DAILY = 1 << 5
+    STORY_HIGHLIGHT = 1 << 6
+    MODERATION_ASSIST = 1 << 7
+    GUARDIAN_BADGE = 1 << 8
+    ALL_PERKS = 1 << 9
+    SAGE_RECOGNITION = 1 << 10
+
+def perks_to_mask(perks: Dict) -> int:
+    """Translate a special_perks dict into its perks_mask bitfield"""
+    mask = 0
+    for name, value in perks.items():
+        flag = Perk.__members__.get(name.upper())
+        if flag is not None and value is True:
+            mask |= flag
+    return int(mask)
+
+# Default rank definitions:
+# (rank_id, rank_name, rank_emoji, points_required, rank_color, special_perks, rank_description, is_special_rank)
+_DEFAULT_RANKS = (
+    # Beginner Ranks
+    (1, 'New Confessor', '🆕', 0, '#808080', '{}', 'Welcome to the community!', 0),
+    (2, 'First Timer', '🌱', 50, '#90EE90', '{"daily_confessions": 2}', 'Getting started with confessions', 0),
+    (3, 'Regular', '📝', 150, '#87CEEB', '{"daily_confessions": 3}', 'Regular community member', 0),
     
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        
-        # User points and ranking table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_rankings (
-            user_id INTEGER PRIMARY KEY,
-            total_points INTEGER DEFAULT 0,
-            current_rank_id INTEGER DEFAULT 1,
-            rank_progress REAL DEFAULT 0.0,
-            weekly_points INTEGER DEFAULT 0,
-            monthly_points INTEGER DEFAULT 0,
-            last_activity TEXT DEFAULT CURRENT_TIMESTAMP,
-            consecutive_days INTEGER DEFAULT 0,
-            highest_rank_achieved INTEGER DEFAULT 1,
-            total_achievements INTEGER DEFAULT 0,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(user_id) REFERENCES users(user_id),
-            FOREIGN KEY(current_rank_id) REFERENCES rank_definitions(rank_id)
-        )''')
-        
-        # Rank definitions table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS rank_definitions (
-            rank_id INTEGER PRIMARY KEY,
-            rank_name TEXT NOT NULL,
-            rank_emoji TEXT NOT NULL,
-            points_required INTEGER NOT NULL,
-            rank_color TEXT DEFAULT '#ffffff',
-            special_perks TEXT, -- JSON string of perks
-            rank_description TEXT,
-            is_special_rank INTEGER DEFAULT 0,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )''')
-        
-        # User achievements table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_achievements (
-            achievement_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            achievement_type TEXT NOT NULL,
-            achievement_name TEXT NOT NULL,
-            achievement_description TEXT,
-            points_awarded INTEGER DEFAULT 0,
-            earned_date TEXT DEFAULT CURRENT_TIMESTAMP,
-            is_special INTEGER DEFAULT 0,
-            metadata TEXT, -- JSON for additional data
-            FOREIGN KEY(user_id) REFERENCES users(user_id)
-        )''')
-        
-        # Point transactions table (for tracking point changes)
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS point_transactions (
-            transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            points_change INTEGER NOT NULL,
-            transaction_type TEXT NOT NULL,
-            reference_id INTEGER, -- post_id, comment_id, etc.
-            reference_type TEXT, -- 'confession', 'comment', 'like', etc.
-            description TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(user_id) REFERENCES users(user_id)
-        )''')
-        
-        # Weekly leaderboard table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS weekly_leaderboard (
-            leaderboard_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            week_start DATE NOT NULL,
-            week_end DATE NOT NULL,
-            points_earned INTEGER NOT NULL,
-            rank_position INTEGER NOT NULL,
-            anonymous_display_name TEXT, -- Generated anonymous name
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(user_id) REFERENCES users(user_id)
-        )''')
-        
-        # Monthly leaderboard table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS monthly_leaderboard (
-            leaderboard_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            month_year TEXT NOT NULL, -- Format: 'YYYY-MM'
-            points_earned INTEGER NOT NULL,
-            rank_position INTEGER NOT NULL,
-            anonymous_display_name TEXT,
-            special_recognition TEXT, -- 'top_confessor', 'top_commenter', etc.
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(user_id) REFERENCES users(user_id)
-        )''')
+    # Intermediate Ranks
+    (4, 'Active Member', '⚡', 300, '#FFD700', '{"daily_confessions": 4, "priority_review": true}', 'Active in the community', 0),
+    (5, 'Community Helper', '🤝', 500, '#FF6347', '{"daily_confessions": 5, "comment_highlight": true}', 'Helps others with thoughtful comments', 0),
+    (6, 'Trusted Confessor', '🌟', 750, '#FF69B4', '{"daily_confessions": 6, "featured_chance": 0.2}', 'Trusted community member', 0),
+    
+    # Advanced Ranks
+    (7, 'Veteran', '🏆', 1200, '#8A2BE2', '{"daily_confessions": 8, "exclusive_categories": true}', 'Long-time community veteran', 0),
+    (8, 'Elite Confessor', '💎', 2000, '#DC143C', '{"daily_confessions": 10, "custom_emoji": true}', 'Elite community member', 0),
+    (9, 'Community Legend', '👑', 3500, '#B8860B', '{"daily_confessions": 15, "legend_badge": true}', 'Legendary status achieved', 1),
+    
+    # Special Ranks
+    (10, 'Master Storyteller', '📚', 5000, '#4B0082', '{"unlimited_daily": true, "story_highlight": true}', 'Master of confession storytelling', 1),
+    (11, 'Community Guardian', '🛡️', 7500, '#800000', '{"moderation_assist": true, "guardian_badge": true}', 'Helps maintain community standards', 1),
+    (12, 'Confession Sage', '🧙‍♂️', 10000, '#FFD700', '{"all_perks": true, "sage_recognition": true}', 'Ultimate community wisdom', 1),
+)
+
+@lru_cache(maxsize=None)
+def get_rank_definition(rank_id: int) -> Optional[Tuple]:
+    """Look up a default rank definition in-process, without querying the database"""
+    return next((rank for rank in _DEFAULT_RANKS if rank[0] == rank_id), None)
+
+# leaderboard.period_kind values
+LEADERBOARD_WEEKLY = 0
+LEADERBOARD_MONTHLY = 1
+
+# Schema objects and seed size a fully migrated database must have
+RANKING_TABLES = (
+    'user_rankings', 'rank_definitions', 'user_achievements', 'point_transactions',
+    'point_transactions_archive', 'leaderboard', 'rank_history',
+)
+RANKING_INDEXES = (
+    'idx_pt_user_created', 'idx_pt_ref', 'idx_ua_user_type', 'idx_ur_points', 'idx_ur_weekly_points',
+    'idx_ur_monthly_points', 'idx_rd_points', 'idx_rh_user',
+    'idx_ur_current_rank', 'idx_lb_user', 'idx_rh_old_rank', 'idx_rh_new_rank', 'idx_pta_user_created',
+)
+DEFAULT_RANK_COUNT = len(_DEFAULT_RANKS)
+
+def is_ranking_schema_current() -> bool:
+    """Check read-only whether the ranking schema and seed data are already in place"""
+    try:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return False  # Database does not exist yet
+    
+    try:
+        expected = RANKING_TABLES + RANKING_INDEXES
+        placeholders = ", ".join("?" * len(expected))
+        cursor = conn.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE type IN ('table', 'index') AND name IN ({placeholders})",
+            expected
+        )
+        if cursor.fetchone()[0] != len(expected):
+            return False
         
-        # Rank history table (track rank changes)
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS rank_history (
-            history_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            old_rank_id INTEGER,
-            new_rank_id INTEGER NOT NULL,
-            points_at_change INTEGER NOT NULL,
-            reason TEXT, -- What triggered the rank change
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(user_id) REFERENCES users(user_id),
-            FOREIGN KEY(old_rank_id) REFERENCES rank_definitions(rank_id),
-            FOREIGN KEY(new_rank_id) REFERENCES rank_definitions(rank_id)
-        )''')
+        for table, upgrade_columns in UPGRADE_COLUMNS.items():
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if not columns.issuperset(upgrade_columns):
+                return False
         
-        conn.commit()
-        logger.info("Ranking system tables created successfully")
+        return conn.execute("SELECT COUNT(*) FROM rank_definitions").fetchone()[0] == DEFAULT_RANK_COUNT
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+# STRICT tables (SQLite 3.37+) enforce column types at write time; older
+# libraries get the same schema without the table option
+if sqlite3.sqlite_version_info >= (3, 37, 0):
+    _STRICT = " STRICT"
+    _WITHOUT_ROWID_STRICT = " WITHOUT ROWID, STRICT"
+else:
+    _STRICT = ""
+    _WITHOUT_ROWID_STRICT = " WITHOUT ROWID"
+
+# Default for integer Unix-epoch timestamp columns
+_EPOCH_NOW = "(CAST(strftime('%s', 'now') AS INTEGER))"
+
+# Full ranking schema, executed as a single script
+RANKING_SCHEMA = f"""
+-- User points and ranking table
+CREATE TABLE IF NOT EXISTS user_rankings (
+    user_id INTEGER PRIMARY KEY,
+    total_points INTEGER DEFAULT 0,
+    current_rank_id INTEGER DEFAULT 1,
+    rank_progress REAL DEFAULT 0.0,
+    weekly_points INTEGER DEFAULT 0,
+    monthly_points INTEGER DEFAULT 0,
+    last_activity TEXT DEFAULT CURRENT_TIMESTAMP,
+    consecutive_days INTEGER DEFAULT 0,
+    highest_rank_achieved INTEGER DEFAULT 1,
+    total_achievements INTEGER DEFAULT 0,
+    total_confessions INTEGER DEFAULT 0,
+    total_comments INTEGER DEFAULT 0,
+    last_activity_day INTEGER,  -- date.toordinal() of the last daily login
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(user_id) REFERENCES users(user_id),
+    FOREIGN KEY(current_rank_id) REFERENCES rank_definitions(rank_id)
+){_STRICT};
+
+-- Rank definitions table
+CREATE TABLE IF NOT EXISTS rank_definitions (
+    rank_id INTEGER PRIMARY KEY,
+    rank_name TEXT NOT NULL,
+    rank_emoji TEXT NOT NULL,
+    points_required INTEGER NOT NULL,
+    rank_color TEXT DEFAULT '#ffffff',
+    special_perks TEXT, -- JSON string of perks
+    rank_description TEXT,
+    is_special_rank INTEGER DEFAULT 0,
+    daily_confessions INTEGER, -- Materialized from special_perks
+    priority_review INTEGER DEFAULT 0,
+    featured_chance REAL DEFAULT 0.0,
+    perks_mask INTEGER DEFAULT 0, -- Perk flags for boolean perks
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+){_WITHOUT_ROWID_STRICT};
+
+-- User achievements table
+CREATE TABLE IF NOT EXISTS user_achievements (
+    achievement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    achievement_type TEXT NOT NULL,
+    achievement_name TEXT NOT NULL,
+    achievement_description TEXT,
+    points_awarded INTEGER DEFAULT 0,
+    earned_date TEXT DEFAULT CURRENT_TIMESTAMP,
+    is_special INTEGER DEFAULT 0,
+    metadata TEXT, -- JSON for additional data
+    FOREIGN KEY(user_id) REFERENCES users(user_id)
+){_STRICT};
 
-def insert_default_ranks():
+-- Point transactions table (for tracking point changes)
+CREATE TABLE IF NOT EXISTS point_transactions (
+    transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    points_change INTEGER NOT NULL,
+    transaction_type TEXT NOT NULL,
+    reference_id INTEGER, -- post_id, comment_id, etc.
+    reference_type TEXT, -- 'confession', 'comment', 'like', etc.
+    description TEXT,
+    created_at INTEGER DEFAULT {_EPOCH_NOW}, -- Unix epoch seconds
+    FOREIGN KEY(user_id) REFERENCES users(user_id)
+){_STRICT};
+
+-- Archived point transactions; keeps the live table and its indexes small
+CREATE TABLE IF NOT EXISTS point_transactions_archive (
+    transaction_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    points_change INTEGER NOT NULL,
+    transaction_type TEXT NOT NULL,
+    reference_id INTEGER,
+    reference_type TEXT,
+    description TEXT,
+    created_at ANY -- Epoch integer or ISO string, as copied from point_transactions
+){_STRICT};
+
+-- Weekly and monthly leaderboards, told apart by period_kind
+CREATE TABLE IF NOT EXISTS leaderboard (
+    period_kind INTEGER NOT NULL, -- LEADERBOARD_WEEKLY or LEADERBOARD_MONTHLY
+    period_bucket INTEGER NOT NULL, -- Unix epoch of the period start (Monday / 1st of month, 00:00 UTC)
+    user_id INTEGER NOT NULL,
+    points_earned INTEGER NOT NULL,
+    rank_position INTEGER NOT NULL,
+    special_recognition TEXT, -- 'top_confessor', 'top_commenter', etc.
+    created_at INTEGER DEFAULT {_EPOCH_NOW}, -- Unix epoch seconds
+    period_start TEXT GENERATED ALWAYS AS (strftime('%Y-%m-%d', period_bucket, 'unixepoch')) VIRTUAL,
+    -- Stable per-period pseudonym: Knuth multiplicative hash of (user_id, period_bucket).
+    -- user_id is reduced first so the multiplication stays within 64-bit integers.
+    anonymous_display_name TEXT GENERATED ALWAYS AS (
+        printf('User_%08X', ((user_id % 2147483647) * 2654435761 + period_bucket) & 4294967295)
+    ) VIRTUAL,
+    PRIMARY KEY(period_kind, period_bucket, rank_position),
+    FOREIGN KEY(user_id) REFERENCES users(user_id)
+){_WITHOUT_ROWID_STRICT};
+
+-- Rank history table (track rank changes)
+CREATE TABLE IF NOT EXISTS rank_history (
+    history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    old_rank_id INTEGER,
+    new_rank_id INTEGER NOT NULL,
+    points_at_change INTEGER NOT NULL,
+    reason TEXT, -- What triggered the rank change
+    created_at INTEGER DEFAULT {_EPOCH_NOW}, -- Unix epoch seconds
+    FOREIGN KEY(user_id) REFERENCES users(user_id),
+    FOREIGN KEY(old_rank_id) REFERENCES rank_definitions(rank_id),
+    FOREIGN KEY(new_rank_id) REFERENCES rank_definitions(rank_id)
+){_STRICT};
+
+"""
+
+# Indexes are built after the seed data is loaded, so each is one batch build
+RANKING_INDEX_DDL = (
+    # Composite indexes for point-transaction and ranking hot paths
+    "CREATE INDEX IF NOT EXISTS idx_pt_user_created ON point_transactions(user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_pt_ref ON point_transactions(reference_type, reference_id)",
+    "CREATE INDEX IF NOT EXISTS idx_ua_user_type ON user_achievements(user_id, achievement_type)",
+    "CREATE INDEX IF NOT EXISTS idx_ur_points ON user_rankings(total_points DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_ur_weekly_points ON user_rankings(weekly_points DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_ur_monthly_points ON user_rankings(monthly_points DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_rd_points ON rank_definitions(points_required DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_rh_user ON rank_history(user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_pta_user_created ON point_transactions_archive(user_id, created_at)",
+    # Foreign-key indexes not already covered by a composite index above
+    "CREATE INDEX IF NOT EXISTS idx_ur_current_rank ON user_rankings(current_rank_id)",
+    "CREATE INDEX IF NOT EXISTS idx_lb_user ON leaderboard(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_rh_old_rank ON rank_history(old_rank_id)",
+    "CREATE INDEX IF NOT EXISTS idx_rh_new_rank ON rank_history(new_rank_id)",
+)
+
+def create_ranking_tables(conn: sqlite3.Connection, messages: List[str]):
+    """Create all ranking system tables (without indexes) and open the migration transaction"""
+    
+    # executescript() commits any pending transaction first, so the
+    # BEGIN has to be part of the script to keep DDL and seed data atomic
+    conn.executescript(f"BEGIN IMMEDIATE;\n{RANKING_SCHEMA}")
+    
+    # Databases created by earlier versions of the schema need these added
+    for table, columns in UPGRADE_COLUMNS.items():
+        added = _ensure_columns(conn, table, columns)
+        if table == 'user_rankings' and added:
+            backfill_activity_counters(conn, added, messages)
+    
+    messages.append("Ranking system tables created successfully")
+
+def backfill_activity_counters(conn: sqlite3.Connection, columns: List[str], messages: List[str]):
+    """Seed newly added activity counters from the core posts/comments tables"""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for column in columns:
+        if column not in COUNTER_BACKFILL:
+            continue
+        source_table, count_sql = COUNTER_BACKFILL[column]
+        if source_table in tables:
+            conn.execute(f"UPDATE user_rankings SET {column} = ({count_sql})")
+            messages.append(f"Backfilled user_rankings.{column} from {source_table}")
+
+def insert_default_ranks(conn: sqlite3.Connection, messages: List[str]):
     """Insert default rank definitions"""
     
-    ranks = [
-        # Beginner Ranks
-        (1, 'New Confessor', '🆕', 0, '#808080', '{}', 'Welcome to the community!', 0),
-        (2, 'First Timer', '🌱', 50, '#90EE90', '{"daily_confessions": 2}', 'Getting started with confessions', 0),
-        (3, 'Regular', '📝', 150, '#87CEEB', '{"daily_confessions": 3}', 'Regular community member', 0),
-        
-        # Intermediate Ranks
-        (4, 'Active Member', '⚡', 300, '#FFD700', '{"daily_confessions": 4, "priority_review": true}', 'Active in the community', 0),
-        (5, 'Community Helper', '🤝', 500, '#FF6347', '{"daily_confessions": 5, "comment_highlight": true}', 'Helps others with thoughtful comments', 0),
-        (6, 'Trusted Confessor', '🌟', 750, '#FF69B4', '{"daily_confessions": 6, "featured_chance": 0.2}', 'Trusted community member', 0),
-        
-        # Advanced Ranks
-        (7, 'Veteran', '🏆', 1200, '#8A2BE2', '{"daily_confessions": 8, "exclusive_categories": true}', 'Long-time community veteran', 0),
-        (8, 'Elite Confessor', '💎', 2000, '#DC143C', '{"daily_confessions": 10, "custom_emoji": true}', 'Elite community member', 0),
-        (9, 'Community Legend', '👑', 3500, '#B8860B', '{"daily_confessions": 15, "legend_badge": true}', 'Legendary status achieved', 1),
-        
-        # Special Ranks
-        (10, 'Master Storyteller', '📚', 5000, '#4B0082', '{"unlimited_daily": true, "story_highlight": true}', 'Master of confession storytelling', 1),
-        (11, 'Community Guardian', '🛡️', 7500, '#800000', '{"moderation_assist": true, "guardian_badge": true}', 'Helps maintain community standards', 1),
-        (12, 'Confession Sage', '🧙‍♂️', 10000, '#FFD700', '{"all_perks": true, "sage_recognition": true}', 'Ultimate community wisdom', 1),
-    ]
+    # Denormalize the numeric perks so rank lookups don't need to parse JSON
+    rows = []
+    for rank in _DEFAULT_RANKS:
+        perks = json.loads(rank[5])
+        rows.append(rank + (
+            perks.get('daily_confessions'),
+            int(bool(perks.get('priority_review'))),
+            perks.get('featured_chance', 0.0),
+            perks_to_mask(perks),
+        ))
+    
+    # Insert every rank with one multi-row statement: a single prepare and step
+    placeholders = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"] * len(rows))
+    params = [value for row in rows for value in row]
     
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.executemany('''
-            INSERT OR REPLACE INTO rank_definitions 
-            (rank_id, rank_name, rank_emoji, points_required, rank_color, special_perks, rank_description, is_special_rank)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', ranks)
-        conn.commit()
-        logger.info(f"Inserted {len(ranks)} default ranks")
+    # Upsert updates existing ranks in place rather than deleting and re-inserting them
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        INSERT INTO rank_definitions 
+        (rank_id, rank_name, rank_emoji, points_required, rank_color, special_perks, rank_description, is_special_rank,
+         daily_confessions, priority_review, featured_chance, perks_mask)
+        VALUES {placeholders}
+        ON CONFLICT(rank_id) DO UPDATE SET
+            rank_name = excluded.rank_name,
+            rank_emoji = excluded.rank_emoji,
+            points_required = excluded.points_required,
+            rank_color = excluded.rank_color,
+            special_perks = excluded.special_perks,
+            rank_description = excluded.rank_description,
+            is_special_rank = excluded.is_special_rank,
+            daily_confessions = excluded.daily_confessions,
+            priority_review = excluded.priority_review,
+            featured_chance = excluded.featured_chance,
+            perks_mask = excluded.perks_mask
+    ''', params)
+    messages.append(f"Inserted {len(_DEFAULT_RANKS)} default ranks")
+
+def create_ranking_indexes(conn: sqlite3.Connection, messages: List[str]):
+    """Create all ranking system indexes once the tables hold their data"""
+    # Run statement by statement: executescript() would commit the migration transaction
+    for statement in RANKING_INDEX_DDL:
+        conn.execute(statement)
+    messages.append(f"Created {len(RANKING_INDEX_DDL)} ranking indexes")
 
 def run_ranking_migration():
     """Run the complete ranking system migration"""
     try:
+        # Warm starts: skip the write transaction when nothing would change
+        if is_ranking_schema_current():
+            logger.info("Ranking system schema is up to date, skipping migration")
+            return True
+        
         logger.info("Starting ranking system migration...")
-        create_ranking_tables()
-        insert_default_ranks()
-        logger.info("Ranking system migration completed successfully!")
+        
+        # Progress is logged once after the commit, not while the write lock is held
+        messages = []
+        
+        # One connection and one explicit transaction for all DDL and seed data
+        conn = sqlite3.connect(DB_PATH, isolation_level=None, cached_statements=256)
+        try:
+            _tune_connection(conn)
+            create_ranking_tables(conn, messages)
+            insert_default_ranks(conn, messages)
+            create_ranking_indexes(conn, messages)
+            # Populate sqlite_stat1 before the first query, sampling at most 1000 rows per index
+            conn.execute("PRAGMA analysis_limit=1000")
+            conn.execute("ANALYZE")
+            conn.commit()
+            # Fold the migration's WAL frames back in once, instead of leaving it to auto-checkpoints
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        messages.append("Ranking system migration completed successfully!")
+        logger.info("; ".join(messages))
         return True
     except Exception as e:
         logger.error(f"Migration failed: {e}")
         return False
 
+def archive_point_transactions(keep_days: int = 90) -> int:
+    """Move point transactions older than keep_days into point_transactions_archive
+    
+    Returns the number of archived rows, or -1 on failure.
+    """
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=keep_days)
+        # created_at is an epoch integer on new databases and an ISO string on older ones
+        params = (int(cutoff.timestamp()), cutoff.strftime('%Y-%m-%d %H:%M:%S'))
+        where = '''
+            WHERE (typeof(created_at) = 'integer' AND created_at < ?)
+               OR (typeof(created_at) = 'text' AND created_at < ?)
+        '''
+        
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f'''
+                INSERT OR IGNORE INTO point_transactions_archive
+                SELECT transaction_id, user_id, points_change, transaction_type,
+                       reference_id, reference_type, description, created_at
+                FROM point_transactions {where}
+            ''', params)
+            archived = conn.execute(f"DELETE FROM point_transactions {where}", params).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        logger.info(f"Archived {archived} point transactions older than {keep_days} days")
+        return archived
+    except Exception as e:
+        logger.error(f"Failed to archive point transactions: {e}")
+        return -1
+
 if __name__ == "__main__":
     success = run_ranking_migration()
     if success:
@@ -5,11 +5,15 @@ Handles points, ranks, achievements, and leaderboards
 
 import sqlite3
 import json
+import bisect
 import random
-from datetime import datetime, timedelta, date
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 
 from config import DB_PATH
 from logger import get_logger
@@ -17,7 +21,7 @@ from utils import escape_markdown_text
 
 logger = get_logger('ranking_system')
 
-@dataclass
+@dataclass(slots=True)
 class UserRank:
     """User ranking information"""
     user_id: int
@@ -30,8 +34,11 @@ class UserRank:
     points_to_next: int
     special_perks: Dict[str, Any]
     is_special_rank: bool
+    # MarkdownV2-escaped rank labels, computed once per rank definition
+    rank_name_escaped: str = ''
+    rank_emoji_escaped: str = ''
 
-@dataclass
+@dataclass(slots=True)
 class Achievement:
     """Achievement information"""
     achievement_type: str
@@ -40,6 +47,99 @@ class Achievement:
     points_awarded: int
     is_special: bool = False
     metadata: Dict[str, Any] = None
+    trigger: Optional[str] = None  # activity_type that can earn it
+
+# Available achievements; static, so built once at import
+ACHIEVEMENTS: Tuple[Achievement, ...] = (
+    # First time achievements
+    Achievement('first_confession', '🎯 First Confession', 'Posted your first confession', 50, trigger='confession_approved'),
+    Achievement('first_comment', '💬 First Comment', 'Made your first comment', 20, trigger='comment_posted'),
+    Achievement('first_like', '👍 First Like', 'Received your first like', 10, trigger='confession_liked'),
+    
+    # Milestone achievements
+    Achievement('confession_milestone_10', '📝 Storyteller', 'Posted 10 confessions', 100, trigger='confession_approved'),
+    Achievement('confession_milestone_50', '📚 Author', 'Posted 50 confessions', 300, trigger='confession_approved'),
+    Achievement('confession_milestone_100', '✍️ Master Writer', 'Posted 100 confessions', 500, True, trigger='confession_approved'),
+    
+    Achievement('comment_milestone_50', '💬 Conversationalist', 'Made 50 comments', 100, trigger='comment_posted'),
+    Achievement('comment_milestone_200', '🗣️ Community Voice', 'Made 200 comments', 300, trigger='comment_posted'),
+    Achievement('comment_milestone_500', '🎙️ Discussion Leader', 'Made 500 comments', 500, True, trigger='comment_posted'),
+    
+    # Engagement achievements
+    Achievement('popular_confession', '🔥 Viral Post', 'Got 100+ likes on a confession', 200, True, trigger='confession_100_likes'),
+    Achievement('helpful_commenter', '🤝 Helper', 'Received 50+ likes on comments', 150, trigger='comment_liked'),
+    Achievement('community_favorite', '⭐ Community Star', 'Top 10 on monthly leaderboard', 300, True),
+    
+    # Streak achievements
+    Achievement('week_streak', '🔥 Week Warrior', '7 consecutive days active', 100, trigger='daily_login'),
+    Achievement('month_streak', '💪 Monthly Master', '30 consecutive days active', 500, True, trigger='daily_login'),
+    Achievement('quarter_streak', '👑 Quarter Champion', '90 consecutive days active', 1000, True, trigger='daily_login'),
+    
+    # Special achievements
+    Achievement('early_bird', '🌅 Early Bird', 'Posted 10 confessions before 8 AM', 100, trigger='confession_approved'),
+    Achievement('night_owl', '🦉 Night Owl', 'Posted 10 confessions after 10 PM', 100, trigger='confession_approved'),
+    Achievement('quality_contributor', '💎 Quality Contributor', '10 high-quality posts', 250, True, trigger='confession_approved'),
+)
+
+# Achievements grouped by the activity that can earn them
+ACHIEVEMENTS_BY_TRIGGER: Dict[str, List[Achievement]] = defaultdict(list)
+for _achievement in ACHIEVEMENTS:
+    if _achievement.trigger:
+        ACHIEVEMENTS_BY_TRIGGER[_achievement.trigger].append(_achievement)
+
+# Milestone achievement -> (user_rankings counter column, threshold)
+ACTIVITY_MILESTONES: Dict[str, Tuple[str, int]] = {
+    'confession_milestone_10': ('total_confessions', 10),
+    'confession_milestone_50': ('total_confessions', 50),
+    'confession_milestone_100': ('total_confessions', 100),
+    'comment_milestone_50': ('total_comments', 50),
+    'comment_milestone_200': ('total_comments', 200),
+    'comment_milestone_500': ('total_comments', 500),
+}
+
+def _milestone_rule(column: str, threshold: int) -> Callable[[Dict[str, int]], bool]:
+    """Build a rule that compares one activity counter against a threshold"""
+    return lambda counts: counts[column] >= threshold
+
+# achievement_type -> qualification rule over the user's activity counters.
+# Triggers already matched the activity, so first-time achievements always pass.
+ACHIEVEMENT_RULES: Dict[str, Callable[[Dict[str, int]], bool]] = {
+    'first_confession': lambda counts: True,
+    'first_comment': lambda counts: True,
+    'first_like': lambda counts: True,
+    **{achievement_type: _milestone_rule(column, threshold)
+       for achievement_type, (column, threshold) in ACTIVITY_MILESTONES.items()},
+}
+
+# Activities counted by the total_confessions / total_comments columns
+CONFESSION_ACTIVITIES = frozenset({'confession_approved'})
+COMMENT_ACTIVITIES = frozenset({'comment_posted', 'quality_comment'})
+
+# Activities that matter even when worth no points, because they extend streaks
+STREAK_ACTIVITIES = frozenset({'daily_login'})
+
+# Pool of anonymous names shown on leaderboards
+_ANON_ADJECTIVES = (
+    'Mysterious', 'Silent', 'Thoughtful', 'Wise', 'Clever', 'Brave',
+    'Gentle', 'Creative', 'Curious', 'Humble', 'Witty', 'Bold',
+    'Peaceful', 'Bright', 'Swift', 'Noble', 'Kind', 'Cheerful'
+)
+_ANON_NOUNS = (
+    'Confessor', 'Student', 'Dreamer', 'Thinker', 'Writer', 'Scholar',
+    'Observer', 'Listener', 'Helper', 'Friend', 'Sage', 'Storyteller',
+    'Guardian', 'Seeker', 'Wanderer', 'Explorer', 'Creator', 'Mentor'
+)
+ANON_NAMES: Tuple[str, ...] = tuple(f"{adj} {noun}" for adj in _ANON_ADJECTIVES for noun in _ANON_NOUNS)
+
+# Leaderboard timeframe -> user_rankings points column (anything else is all-time)
+LEADERBOARD_COLUMNS = {
+    'weekly': 'weekly_points',
+    'monthly': 'monthly_points',
+    'alltime': 'total_points',
+}
+
+# Seconds a computed leaderboard is served from memory before it is re-queried
+LEADERBOARD_CACHE_TTL = 30
 
 class PointSystem:
     """Manages point calculations and awards"""
@@ -84,10 +184,15 @@ class PointSystem:
         'inappropriate_content': -25,
     }
     
+    # Activities whose points depend on the award context; all others are a flat lookup
+    CONTEXT_SCALED = frozenset({'consecutive_days_bonus', 'quality_comment', 'confession_liked'})
+    
     @staticmethod
     def calculate_points(activity_type: str, **kwargs) -> int:
         """Calculate points for an activity"""
         base_points = PointSystem.POINT_VALUES.get(activity_type, 0)
+        if activity_type not in PointSystem.CONTEXT_SCALED:
+            return base_points
         
         # Apply multipliers based on context
         if activity_type == 'consecutive_days_bonus':
@@ -114,56 +219,131 @@ class PointSystem:
 class RankingManager:
     """Main ranking system manager"""
     
+    _AWARD_UPDATE_SQL = '''
+        UPDATE user_rankings 
+        SET total_points = total_points + ?,
+            weekly_points = weekly_points + ?,
+            monthly_points = monthly_points + ?,
+            total_confessions = total_confessions + ?,
+            total_comments = total_comments + ?,
+            last_activity = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = ?
+    '''
+    
+    _USER_RANK_SQL = '''
+        SELECT ur.total_points, ur.current_rank_id, ur.rank_progress,
+               rd.rank_name, rd.rank_emoji, rd.is_special_rank,
+               next_rd.points_required as next_rank_points
+        FROM user_rankings ur
+        JOIN rank_definitions rd ON ur.current_rank_id = rd.rank_id
+        LEFT JOIN rank_definitions next_rd ON next_rd.rank_id = rd.rank_id + 1
+        WHERE ur.user_id = ?
+    '''
+    
+    # One leaderboard statement per points column, built once so every call
+    # reuses the same prepared statement
+    _LEADERBOARD_SQL = {
+        points_column: f'''
+            SELECT ur.{points_column}, ur.current_rank_id, rd.rank_emoji, rd.rank_name
+            FROM user_rankings ur
+            JOIN rank_definitions rd ON ur.current_rank_id = rd.rank_id
+            WHERE ur.{points_column} > 0
+            ORDER BY ur.{points_column} DESC
+            LIMIT ?
+        '''
+        for points_column in LEADERBOARD_COLUMNS.values()
+    }
+    
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
-        self.anonymous_names = self._generate_anonymous_names()
+        self.anonymous_names = ANON_NAMES
+        self._lock = threading.RLock()
+        self.conn = self._connect()
+        # rank_definitions is static once migrated; loaded on first use
+        self._ranks: List[Tuple[int, str, int]] = []
+        self._rank_points: List[int] = []
+        self._perks_by_rank: Dict[int, Dict[str, Any]] = {}
+        self._escaped_rank_labels: Dict[int, Tuple[str, str]] = {}
+        # (timeframe, limit) -> (monotonic expiry, leaderboard)
+        self._leaderboard_cache: Dict[Tuple[str, int], Tuple[float, List[Dict]]] = {}
     
-    def _generate_anonymous_names(self) -> List[str]:
-        """Generate pool of anonymous names for leaderboards"""
-        adjectives = [
-            'Mysterious', 'Silent', 'Thoughtful', 'Wise', 'Clever', 'Brave',
-            'Gentle', 'Creative', 'Curious', 'Humble', 'Witty', 'Bold',
-            'Peaceful', 'Bright', 'Swift', 'Noble', 'Kind', 'Cheerful'
-        ]
-        nouns = [
-            'Confessor', 'Student', 'Dreamer', 'Thinker', 'Writer', 'Scholar',
-            'Observer', 'Listener', 'Helper', 'Friend', 'Sage', 'Storyteller',
-            'Guardian', 'Seeker', 'Wanderer', 'Explorer', 'Creator', 'Mentor'
-        ]
-        
-        names = []
-        for adj in adjectives:
-            for noun in nouns:
-                names.append(f"{adj} {noun}")
-        return names
+    def _connect(self) -> sqlite3.Connection:
+        """Open the long-lived connection shared by all manager calls"""
+        # Statements are fixed strings, so the statement cache keeps them prepared
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False,
+                               cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")  # 20MB page cache
+        conn.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped reads
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Run a block of statements as one write transaction on the shared connection"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except Exception:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+    
+    @staticmethod
+    @contextmanager
+    def _savepoint(cursor):
+        """Undo a helper's partial writes on error without aborting the enclosing transaction"""
+        cursor.execute("SAVEPOINT ranking_step")
+        try:
+            yield
+        except Exception:
+            cursor.execute("ROLLBACK TO ranking_step")
+            cursor.execute("RELEASE ranking_step")
+            raise
+        cursor.execute("RELEASE ranking_step")
     
     def initialize_user_ranking(self, user_id: int) -> bool:
         """Initialize ranking data for a new user"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self.conn.cursor()
                 cursor.execute('''
                     INSERT OR IGNORE INTO user_rankings (user_id)
                     VALUES (?)
                 ''', (user_id,))
-                conn.commit()
                 return True
         except Exception as e:
             logger.error(f"Failed to initialize ranking for user {user_id}: {e}")
             return False
     
+    def purge_user(self, user_id: int) -> bool:
+        """Delete all ranking data for a user in one transaction"""
+        try:
+            with self._transaction() as cursor:
+                for table in ('user_rankings', 'point_transactions', 'user_achievements', 'rank_history'):
+                    cursor.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+                self._leaderboard_cache.clear()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to purge ranking data for user {user_id}: {e}")
+            return False
+    
     def award_points(self, user_id: int, activity_type: str, reference_id: int = None, 
                     reference_type: str = None, **kwargs) -> Tuple[bool, int]:
         """Award points to a user for an activity"""
         try:
-            self.initialize_user_ranking(user_id)
-            
             points = PointSystem.calculate_points(activity_type, **kwargs)
+            if points == 0 and activity_type not in STREAK_ACTIVITIES:
+                # Unknown or worthless activity: nothing to record or check
+                return True, 0
             description = kwargs.get('description', f"Points for {activity_type}")
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
+            # The award, rank-up and achievement checks all commit together
+            with self._transaction() as cursor:
                 # Record point transaction
                 cursor.execute('''
                     INSERT INTO point_transactions 
@@ -171,293 +351,332 @@ class RankingManager:
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (user_id, points, activity_type, reference_id, reference_type, description))
                 
-                # Update user's total points
-                cursor.execute('''
-                    UPDATE user_rankings 
-                    SET total_points = total_points + ?,
-                        weekly_points = weekly_points + ?,
-                        monthly_points = monthly_points + ?,
-                        last_activity = CURRENT_TIMESTAMP,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE user_id = ?
-                ''', (points, points, points, user_id))
+                # Update user's total points and activity counters
+                update_args = (points, points, points,
+                               int(activity_type in CONFESSION_ACTIVITIES),
+                               int(activity_type in COMMENT_ACTIVITIES),
+                               user_id)
+                cursor.execute(self._AWARD_UPDATE_SQL, update_args)
+                if cursor.rowcount == 0:
+                    # First award for this user: create the row, then apply the update
+                    cursor.execute('INSERT INTO user_rankings (user_id) VALUES (?)', (user_id,))
+                    cursor.execute(self._AWARD_UPDATE_SQL, update_args)
                 
                 # Update consecutive days if it's a daily login
                 if activity_type == 'daily_login':
                     self._update_consecutive_days(cursor, user_id)
                 
-                conn.commit()
-                
                 # Check for rank up
-                self._check_rank_up(user_id)
+                self._check_rank_up(cursor, user_id)
                 
                 # Check for achievements
-                self._check_achievements(user_id, activity_type, **kwargs)
-                
-                logger.info(f"Awarded {points} points to user {user_id} for {activity_type}")
-                return True, points
+                self._check_achievements(cursor, user_id, activity_type, **kwargs)
+            
+            logger.info(f"Awarded {points} points to user {user_id} for {activity_type}")
+            return True, points
                 
         except Exception as e:
             logger.error(f"Failed to award points to user {user_id}: {e}")
             return False, 0
-    
+
+    def award_points_many(self, user_activities: List[Tuple]) -> Tuple[bool, int]:
+        """Award points for a batch of activities in a single transaction
+
+        Each entry is (user_id, activity_type[, reference_id[, reference_type[, description]]]).
+        Returns (success, total points awarded).
+        """
+        if not user_activities:
+            return True, 0
+
+        try:
+            transactions = []
+            totals = Counter()
+            confessions = Counter()
+            comments = Counter()
+            daily_login_users = set()
+
+            for activity in user_activities:
+                user_id, activity_type, reference_id, reference_type, description = (
+                    tuple(activity) + (None,) * (5 - len(activity))
+                )
+                points = PointSystem.calculate_points(activity_type)
+                if points == 0 and activity_type not in STREAK_ACTIVITIES:
+                    continue
+                transactions.append((
+                    user_id, points, activity_type, reference_id, reference_type,
+                    description or f"Points for {activity_type}"
+                ))
+                totals[user_id] += points
+                confessions[user_id] += activity_type in CONFESSION_ACTIVITIES
+                comments[user_id] += activity_type in COMMENT_ACTIVITIES
+                if activity_type == 'daily_login':
+                    daily_login_users.add(user_id)
+
+            if not transactions:
+                return True, 0
+
+            with self._transaction() as cursor:
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO user_rankings (user_id)
+                    VALUES (?)
+                ''', [(user_id,) for user_id in totals])
+
+                cursor.executemany('''
+                    INSERT INTO point_transactions
+                    (user_id, points_change, transaction_type, reference_id, reference_type, description)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', transactions)
+
+                # One aggregated update per user, however many activities they had
+                cursor.executemany(self._AWARD_UPDATE_SQL, [
+                    (points, points, points, confessions[user_id], comments[user_id], user_id)
+                    for user_id, points in totals.items()
+                ])
+
+                for user_id in daily_login_users:
+                    self._update_consecutive_days(cursor, user_id)
+
+                for user_id in totals:
+                    self._check_rank_up(cursor, user_id)
+
+                # Achievements depend on the final totals, so each distinct
+                # (user, activity) pair only needs checking once
+                activity_pairs = dict.fromkeys(
+                    (user_id, activity_type) for user_id, _, activity_type, _, _, _ in transactions
+                )
+                for user_id, activity_type in activity_pairs:
+                    self._check_achievements(cursor, user_id, activity_type)
+
+            total_awarded = sum(totals.values())
+            logger.info(f"Awarded {total_awarded} points across {len(transactions)} activities for {len(totals)} users")
+            return True, total_awarded
+
+        except Exception as e:
+            logger.error(f"Failed to award points in batch: {e}")
+            return False, 0
+
     def _update_consecutive_days(self, cursor, user_id: int):
         """Update consecutive days count"""
+        today = date.today().toordinal()
         cursor.execute('''
-            SELECT last_activity, consecutive_days 
+            SELECT last_activity_day, consecutive_days 
             FROM user_rankings WHERE user_id = ?
         ''', (user_id,))
         
         result = cursor.fetchone()
         if not result:
             return
+        
+        last_day, consecutive_days = result
+        if last_day == today:
+            return  # Already counted today
+        
+        # Consecutive day extends the streak, anything else restarts it
+        new_consecutive = consecutive_days + 1 if last_day == today - 1 else 1
+        cursor.execute('''
+            UPDATE user_rankings 
+            SET consecutive_days = ?, last_activity_day = ?
+            WHERE user_id = ?
+        ''', (new_consecutive, today, user_id))
+        
+        # Award bonus points for streak
+        if new_consecutive >= 3:
+            bonus_points = PointSystem.calculate_points(
+                'consecutive_days_bonus', 
+                consecutive_days=new_consecutive
+            )
+            cursor.execute('''
+                INSERT INTO point_transactions 
+                (user_id, points_change, transaction_type, description)
+                VALUES (?, ?, ?, ?)
+            ''', (user_id, bonus_points, 'consecutive_days_bonus', 
+                  f"Consecutive days bonus: {new_consecutive} days"))
             
-        last_activity_str, consecutive_days = result
-        if last_activity_str:
-            last_activity = datetime.fromisoformat(last_activity_str).date()
-            today = date.today()
-            yesterday = today - timedelta(days=1)
-            
-            if last_activity == yesterday:
-                # Consecutive day
-                new_consecutive = consecutive_days + 1
-                cursor.execute('''
-                    UPDATE user_rankings 
-                    SET consecutive_days = ?
-                    WHERE user_id = ?
-                ''', (new_consecutive, user_id))
-                
-                # Award bonus points for streak
-                if new_consecutive >= 3:
-                    bonus_points = PointSystem.calculate_points(
-                        'consecutive_days_bonus', 
-                        consecutive_days=new_consecutive
-                    )
-                    cursor.execute('''
-                        INSERT INTO point_transactions 
-                        (user_id, points_change, transaction_type, description)
-                        VALUES (?, ?, ?, ?)
-                    ''', (user_id, bonus_points, 'consecutive_days_bonus', 
-                          f"Consecutive days bonus: {new_consecutive} days"))
-                    
-                    cursor.execute('''
-                        UPDATE user_rankings 
-                        SET total_points = total_points + ?
-                        WHERE user_id = ?
-                    ''', (bonus_points, user_id))
-                    
-            elif last_activity != today:
-                # Streak broken
-                cursor.execute('''
-                    UPDATE user_rankings 
-                    SET consecutive_days = 1
-                    WHERE user_id = ?
-                ''', (user_id,))
+            cursor.execute('''
+                UPDATE user_rankings 
+                SET total_points = total_points + ?
+                WHERE user_id = ?
+            ''', (bonus_points, user_id))
     
-    def _check_rank_up(self, user_id: int) -> bool:
+    def _load_rank_definitions(self, cursor):
+        """Load rank_definitions into memory, sorted by points_required"""
+        if self._ranks:
+            return
+        cursor.execute('''
+            SELECT rank_id, rank_name, points_required, special_perks, rank_emoji
+            FROM rank_definitions
+            ORDER BY points_required
+        ''')
+        rows = cursor.fetchall()
+        self._ranks = [(rank_id, rank_name, points_required) for rank_id, rank_name, points_required, _, _ in rows]
+        self._rank_points = [points_required for _, _, points_required, _, _ in rows]
+        # Perks are static per rank, so parse the JSON once rather than per lookup
+        self._perks_by_rank = {rank_id: json.loads(perks or '{}') for rank_id, _, _, perks, _ in rows}
+        # Likewise the rank labels only need escaping for MarkdownV2 once
+        self._escaped_rank_labels = {
+            rank_id: (escape_markdown_text(rank_name), escape_markdown_text(rank_emoji))
+            for rank_id, rank_name, _, _, rank_emoji in rows
+        }
+    
+    def _check_rank_up(self, cursor, user_id: int) -> bool:
         """Check if user should rank up"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get user's current points and rank
+            # Get user's current points and rank
+            cursor.execute('''
+                SELECT total_points, current_rank_id
+                FROM user_rankings
+                WHERE user_id = ?
+            ''', (user_id,))
+            
+            result = cursor.fetchone()
+            if not result:
+                return False
+            
+            total_points, current_rank_id = result
+            
+            # Find the highest rank this user qualifies for
+            self._load_rank_definitions(cursor)
+            position = bisect.bisect_right(self._rank_points, total_points) - 1
+            if position < 0:
+                return False
+            
+            new_rank_id, new_rank_name, _ = self._ranks[position]
+            
+            # Most awards leave the rank unchanged, so nothing is written
+            if new_rank_id <= current_rank_id:
+                return False
+            
+            # Rank up!
+            with self._savepoint(cursor):
                 cursor.execute('''
-                    SELECT ur.total_points, ur.current_rank_id, rd.points_required
-                    FROM user_rankings ur
-                    JOIN rank_definitions rd ON ur.current_rank_id = rd.rank_id
-                    WHERE ur.user_id = ?
-                ''', (user_id,))
-                
-                result = cursor.fetchone()
-                if not result:
-                    return False
-                
-                total_points, current_rank_id, current_rank_points = result
+                    UPDATE user_rankings
+                    SET current_rank_id = ?,
+                        highest_rank_achieved = CASE 
+                            WHEN ? > highest_rank_achieved THEN ?
+                            ELSE highest_rank_achieved
+                        END
+                    WHERE user_id = ?
+                ''', (new_rank_id, new_rank_id, new_rank_id, user_id))
                 
-                # Find the highest rank this user qualifies for
+                # Record rank change
                 cursor.execute('''
-                    SELECT rank_id, rank_name, points_required
-                    FROM rank_definitions
-                    WHERE points_required <= ?
-                    ORDER BY points_required DESC
-                    LIMIT 1
-                ''', (total_points,))
-                
-                new_rank_result = cursor.fetchone()
-                if not new_rank_result:
-                    return False
-                
-                new_rank_id, new_rank_name, _ = new_rank_result
+                    INSERT INTO rank_history
+                    (user_id, old_rank_id, new_rank_id, points_at_change, reason)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (user_id, current_rank_id, new_rank_id, total_points, 'Points threshold reached'))
                 
-                if new_rank_id > current_rank_id:
-                    # Rank up!
-                    cursor.execute('''
-                        UPDATE user_rankings
-                        SET current_rank_id = ?,
-                            highest_rank_achieved = CASE 
-                                WHEN ? > highest_rank_achieved THEN ?
-                                ELSE highest_rank_achieved
-                            END
-                        WHERE user_id = ?
-                    ''', (new_rank_id, new_rank_id, new_rank_id, user_id))
-                    
-                    # Record rank change
-                    cursor.execute('''
-                        INSERT INTO rank_history
-                        (user_id, old_rank_id, new_rank_id, points_at_change, reason)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (user_id, current_rank_id, new_rank_id, total_points, 'Points threshold reached'))
-                    
-                    conn.commit()
-                    
-                    # Award rank up achievement
-                    self._award_achievement(
-                        user_id, 
-                        'rank_up', 
-                        f'Ranked Up to {new_rank_name}',
-                        f'Achieved {new_rank_name} rank!',
-                        50
-                    )
-                    
-                    logger.info(f"User {user_id} ranked up to {new_rank_name}")
-                    return True
-                
-                return False
+                # Award rank up achievement
+                self._award_achievement(
+                    cursor,
+                    user_id, 
+                    'rank_up', 
+                    f'Ranked Up to {new_rank_name}',
+                    f'Achieved {new_rank_name} rank!',
+                    50
+                )
+            
+            logger.info(f"User {user_id} ranked up to {new_rank_name}")
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to check rank up for user {user_id}: {e}")
             return False
     
-    def _check_achievements(self, user_id: int, activity_type: str, **kwargs):
+    def _check_achievements(self, cursor, user_id: int, activity_type: str, **kwargs):
         """Check and award achievements"""
-        achievements_to_check = self._get_achievement_definitions()
+        candidates = ACHIEVEMENTS_BY_TRIGGER.get(activity_type)
+        if not candidates:
+            return
         
-        for achievement in achievements_to_check:
-            if self._user_qualifies_for_achievement(user_id, achievement, activity_type, **kwargs):
-                self._award_achievement(
-                    user_id,
-                    achievement.achievement_type,
-                    achievement.achievement_name,
-                    achievement.achievement_description,
-                    achievement.points_awarded,
-                    achievement.is_special
-                )
+        # Read once for this check; other processes may award achievements too,
+        # so the set is not kept between calls
+        earned = self._get_earned_achievements(cursor, user_id)
+        pending = [
+            achievement for achievement in candidates
+            if achievement.achievement_type not in earned
+            and achievement.achievement_type in ACHIEVEMENT_RULES
+        ]
+        if not pending:
+            return
+        
+        # Counters are read once, and only when a milestone is in play
+        needs_counts = any(a.achievement_type in ACTIVITY_MILESTONES for a in pending)
+        counts = self._get_activity_counts(cursor, user_id) if needs_counts else {}
+        earned_now = [a for a in pending if ACHIEVEMENT_RULES[a.achievement_type](counts)]
+        if earned_now:
+            self._award_achievements(cursor, user_id, earned_now)
     
-    def _get_achievement_definitions(self) -> List[Achievement]:
+    def _get_achievement_definitions(self) -> Tuple[Achievement, ...]:
         """Get list of available achievements"""
-        return [
-            # First time achievements
-            Achievement('first_confession', '🎯 First Confession', 'Posted your first confession', 50),
-            Achievement('first_comment', '💬 First Comment', 'Made your first comment', 20),
-            Achievement('first_like', '👍 First Like', 'Received your first like', 10),
-            
-            # Milestone achievements
-            Achievement('confession_milestone_10', '📝 Storyteller', 'Posted 10 confessions', 100),
-            Achievement('confession_milestone_50', '📚 Author', 'Posted 50 confessions', 300),
-            Achievement('confession_milestone_100', '✍️ Master Writer', 'Posted 100 confessions', 500, True),
-            
-            Achievement('comment_milestone_50', '💬 Conversationalist', 'Made 50 comments', 100),
-            Achievement('comment_milestone_200', '🗣️ Community Voice', 'Made 200 comments', 300),
-            Achievement('comment_milestone_500', '🎙️ Discussion Leader', 'Made 500 comments', 500, True),
-            
-            # Engagement achievements
-            Achievement('popular_confession', '🔥 Viral Post', 'Got 100+ likes on a confession', 200, True),
-            Achievement('helpful_commenter', '🤝 Helper', 'Received 50+ likes on comments', 150),
-            Achievement('community_favorite', '⭐ Community Star', 'Top 10 on monthly leaderboard', 300, True),
-            
-            # Streak achievements
-            Achievement('week_streak', '🔥 Week Warrior', '7 consecutive days active', 100),
-            Achievement('month_streak', '💪 Monthly Master', '30 consecutive days active', 500, True),
-            Achievement('quarter_streak', '👑 Quarter Champion', '90 consecutive days active', 1000, True),
-            
-            # Special achievements
-            Achievement('early_bird', '🌅 Early Bird', 'Posted 10 confessions before 8 AM', 100),
-            Achievement('night_owl', '🦉 Night Owl', 'Posted 10 confessions after 10 PM', 100),
-            Achievement('quality_contributor', '💎 Quality Contributor', '10 high-quality posts', 250, True),
-        ]
+        return ACHIEVEMENTS
     
-    def _user_qualifies_for_achievement(self, user_id: int, achievement: Achievement, 
-                                      activity_type: str, **kwargs) -> bool:
-        """Check if user qualifies for a specific achievement"""
-        # Check if user already has this achievement
-        if self._user_has_achievement(user_id, achievement.achievement_type):
-            return False
-        
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                if achievement.achievement_type == 'first_confession' and activity_type == 'confession_approved':
-                    return True
-                elif achievement.achievement_type == 'first_comment' and activity_type == 'comment_posted':
-                    return True
-                elif achievement.achievement_type == 'first_like' and activity_type == 'confession_liked':
-                    return True
-                elif achievement.achievement_type == 'confession_milestone_10':
-                    cursor.execute('SELECT COUNT(*) FROM posts WHERE user_id = ? AND approved = 1', (user_id,))
-                    count = cursor.fetchone()[0]
-                    return count >= 10
-                elif achievement.achievement_type == 'confession_milestone_50':
-                    cursor.execute('SELECT COUNT(*) FROM posts WHERE user_id = ? AND approved = 1', (user_id,))
-                    count = cursor.fetchone()[0]
-                    return count >= 50
-                elif achievement.achievement_type == 'confession_milestone_100':
-                    cursor.execute('SELECT COUNT(*) FROM posts WHERE user_id = ? AND approved = 1', (user_id,))
-                    count = cursor.fetchone()[0]
-                    return count >= 100
-                # Add more achievement checks here...
-                
-        except Exception as e:
-            logger.error(f"Error checking achievement qualification: {e}")
-        
-        return False
+    def _get_activity_counts(self, cursor, user_id: int) -> Dict[str, int]:
+        """Get the user's activity counters used by milestone rules"""
+        cursor.execute('''
+            SELECT total_confessions, total_comments
+            FROM user_rankings WHERE user_id = ?
+        ''', (user_id,))
+        total_confessions, total_comments = cursor.fetchone() or (0, 0)
+        return {'total_confessions': total_confessions, 'total_comments': total_comments}
     
-    def _user_has_achievement(self, user_id: int, achievement_type: str) -> bool:
+    def _get_earned_achievements(self, cursor, user_id: int) -> Set[str]:
+        """Get the achievement types a user holds"""
+        cursor.execute('''
+            SELECT achievement_type FROM user_achievements
+            WHERE user_id = ?
+        ''', (user_id,))
+        return {row[0] for row in cursor.fetchall()}
+    
+    def _user_has_achievement(self, cursor, user_id: int, achievement_type: str) -> bool:
         """Check if user already has an achievement"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT COUNT(*) FROM user_achievements 
-                    WHERE user_id = ? AND achievement_type = ?
-                ''', (user_id, achievement_type))
-                return cursor.fetchone()[0] > 0
+            cursor.execute('''
+                SELECT 1 FROM user_achievements
+                WHERE user_id = ? AND achievement_type = ?
+            ''', (user_id, achievement_type))
+            return cursor.fetchone() is not None
         except Exception as e:
             logger.error(f"Error checking user achievement: {e}")
             return True  # Assume they have it to prevent duplicate awards
     
-    def _award_achievement(self, user_id: int, achievement_type: str, name: str, 
+    def _award_achievement(self, cursor, user_id: int, achievement_type: str, name: str, 
                           description: str, points: int, is_special: bool = False):
         """Award an achievement to a user"""
+        self._award_achievements(cursor, user_id, [
+            Achievement(achievement_type, name, description, points, is_special)
+        ])
+    
+    def _award_achievements(self, cursor, user_id: int, achievements: List[Achievement]):
+        """Award several achievements to a user with one batch of writes"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Award achievement
-                cursor.execute('''
+            with self._savepoint(cursor):
+                # Award achievements
+                cursor.executemany('''
                     INSERT INTO user_achievements
                     (user_id, achievement_type, achievement_name, achievement_description, 
                      points_awarded, is_special)
                     VALUES (?, ?, ?, ?, ?, ?)
-                ''', (user_id, achievement_type, name, description, points, is_special))
+                ''', [(user_id, a.achievement_type, a.achievement_name, a.achievement_description,
+                       a.points_awarded, a.is_special) for a in achievements])
                 
                 # Award points
-                cursor.execute('''
+                cursor.executemany('''
                     INSERT INTO point_transactions
                     (user_id, points_change, transaction_type, description)
                     VALUES (?, ?, ?, ?)
-                ''', (user_id, points, 'achievement', f'Achievement: {name}'))
+                ''', [(user_id, a.points_awarded, 'achievement', f'Achievement: {a.achievement_name}')
+                      for a in achievements])
                 
                 # Update user points and achievement count
                 cursor.execute('''
                     UPDATE user_rankings
                     SET total_points = total_points + ?,
-                        total_achievements = total_achievements + 1
+                        total_achievements = total_achievements + ?
                     WHERE user_id = ?
-                ''', (points, user_id))
-                
-                conn.commit()
-                logger.info(f"Awarded achievement '{name}' to user {user_id}")
+                ''', (sum(a.points_awarded for a in achievements), len(achievements), user_id))
+            
+            for a in achievements:
+                logger.info(f"Awarded achievement '{a.achievement_name}' to user {user_id}")
                 
         except Exception as e:
             logger.error(f"Failed to award achievement to user {user_id}: {e}")
@@ -465,28 +684,27 @@ class RankingManager:
     def get_user_rank(self, user_id: int) -> Optional[UserRank]:
         """Get complete ranking information for a user"""
         try:
-            self.initialize_user_ranking(user_id)
-            
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT ur.total_points, ur.current_rank_id, ur.rank_progress,
-                           rd.rank_name, rd.rank_emoji, rd.special_perks, rd.is_special_rank,
-                           next_rd.points_required as next_rank_points
-                    FROM user_rankings ur
-                    JOIN rank_definitions rd ON ur.current_rank_id = rd.rank_id
-                    LEFT JOIN rank_definitions next_rd ON next_rd.rank_id = rd.rank_id + 1
-                    WHERE ur.user_id = ?
-                ''', (user_id,))
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute(self._USER_RANK_SQL, (user_id,))
                 
                 result = cursor.fetchone()
                 if not result:
-                    return None
+                    # Unknown user: create the ranking row, then read it back
+                    self.initialize_user_ranking(user_id)
+                    cursor.execute(self._USER_RANK_SQL, (user_id,))
+                    result = cursor.fetchone()
+                    if not result:
+                        return None
                 
                 (total_points, current_rank_id, rank_progress, rank_name, 
-                 rank_emoji, special_perks_json, is_special_rank, next_rank_points) = result
+                 rank_emoji, is_special_rank, next_rank_points) = result
                 
-                special_perks = json.loads(special_perks_json or '{}')
+                self._load_rank_definitions(cursor)
+                special_perks = self._perks_by_rank.get(current_rank_id, {})
+                rank_name_escaped, rank_emoji_escaped = self._escaped_rank_labels.get(
+                    current_rank_id, (escape_markdown_text(rank_name), escape_markdown_text(rank_emoji))
+                )
                 points_to_next = (next_rank_points or 0) - total_points
                 
                 return UserRank(
@@ -499,7 +717,9 @@ class RankingManager:
                     next_rank_points=next_rank_points or 0,
                     points_to_next=max(0, points_to_next),
                     special_perks=special_perks,
-                    is_special_rank=bool(is_special_rank)
+                    is_special_rank=bool(is_special_rank),
+                    rank_name_escaped=rank_name_escaped,
+                    rank_emoji_escaped=rank_emoji_escaped
                 )
                 
         except Exception as e:
@@ -509,55 +729,43 @@ class RankingManager:
     def get_leaderboard(self, timeframe: str = 'weekly', limit: int = 10) -> List[Dict]:
         """Get leaderboard for specified timeframe"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                if timeframe == 'weekly':
-                    cursor.execute('''
-                        SELECT ur.weekly_points, rd.rank_emoji, rd.rank_name,
-                               ROW_NUMBER() OVER (ORDER BY ur.weekly_points DESC) as position
-                        FROM user_rankings ur
-                        JOIN rank_definitions rd ON ur.current_rank_id = rd.rank_id
-                        WHERE ur.weekly_points > 0
-                        ORDER BY ur.weekly_points DESC
-                        LIMIT ?
-                    ''', (limit,))
-                elif timeframe == 'monthly':
-                    cursor.execute('''
-                        SELECT ur.monthly_points, rd.rank_emoji, rd.rank_name,
-                               ROW_NUMBER() OVER (ORDER BY ur.monthly_points DESC) as position
-                        FROM user_rankings ur
-                        JOIN rank_definitions rd ON ur.current_rank_id = rd.rank_id
-                        WHERE ur.monthly_points > 0
-                        ORDER BY ur.monthly_points DESC
-                        LIMIT ?
-                    ''', (limit,))
-                else:  # all-time
-                    cursor.execute('''
-                        SELECT ur.total_points, rd.rank_emoji, rd.rank_name,
-                               ROW_NUMBER() OVER (ORDER BY ur.total_points DESC) as position
-                        FROM user_rankings ur
-                        JOIN rank_definitions rd ON ur.current_rank_id = rd.rank_id
-                        WHERE ur.total_points > 0
-                        ORDER BY ur.total_points DESC
-                        LIMIT ?
-                    ''', (limit,))
-                
+            with self._lock:
+                # Column names come from LEADERBOARD_COLUMNS, never from the caller
+                points_column = LEADERBOARD_COLUMNS.get(timeframe, 'total_points')
+                
+                # Boards are read far more often than they change, so a few
+                # seconds of staleness is traded for skipping the query. Keyed
+                # on the resolved column, so unknown timeframes share the
+                # all-time entry instead of adding their own.
+                key = (points_column, limit)
+                cached = self._leaderboard_cache.get(key)
+                now = time.monotonic()
+                if cached:
+                    if cached[0] > now:
+                        return cached[1]
+                    del self._leaderboard_cache[key]
+                
+                cursor = self.conn.cursor()
+                cursor.execute(self._LEADERBOARD_SQL[points_column], (limit,))
                 results = cursor.fetchall()
-                leaderboard = []
+                self._load_rank_definitions(cursor)
                 
-                for i, (points, rank_emoji, rank_name, position) in enumerate(results):
-                    # Generate anonymous name
-                    anonymous_name = random.choice(self.anonymous_names)
-                    
-                    leaderboard.append({
+                # Distinct anonymous names for every row, drawn in one call
+                names = random.sample(self.anonymous_names, len(results))
+                leaderboard = [
+                    {
                         'position': position,
                         'anonymous_name': anonymous_name,
                         'points': points,
                         'rank_emoji': rank_emoji,
-                        'rank_name': rank_name
-                    })
-                
+                        'rank_name': rank_name,
+                        'rank_emoji_escaped': self._escaped_rank_labels[rank_id][1],
+                        'rank_name_escaped': self._escaped_rank_labels[rank_id][0]
+                    }
+                    for position, ((points, rank_id, rank_emoji, rank_name), anonymous_name)
+                    in enumerate(zip(results, names), start=1)
+                ]
+                self._leaderboard_cache[key] = (now + LEADERBOARD_CACHE_TTL, leaderboard)
                 return leaderboard
                 
         except Exception as e:
@@ -567,8 +775,8 @@ class RankingManager:
     def get_user_achievements(self, user_id: int, limit: int = 20) -> List[Dict]:
         """Get user's achievements"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self.conn.cursor()
                 cursor.execute('''
                     SELECT achievement_name, achievement_description, points_awarded,
                            earned_date, is_special
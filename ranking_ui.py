@@ -3,27 +3,233 @@ UI Components for Ranking System
 Handles display of ranks, leaderboards, achievements, and progress
 """
 
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, Update
 from telegram.ext import ContextTypes
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
+from collections import OrderedDict
+import asyncio
 import math
+import threading
+import time
 
-from ranking_system import ranking_manager, UserRank
+from ranking_system import ranking_manager, UserRank, LEADERBOARD_COLUMNS
 from utils import escape_markdown_text
 from logger import get_logger
 
 logger = get_logger('ranking_ui')
 
+@lru_cache(maxsize=4096)
+def _escape(text) -> str:
+    """Memoized escape_markdown_text for the small strings that repeat across renders"""
+    return escape_markdown_text(text)
+
+# Unit separator: never escaped by MarkdownV2 and absent from achievement texts
+_FIELD_SEP = "\x1f"
+
+# timeframe -> (leaderboard it was rendered from, rendered text). The manager
+# hands back the same list object while its own cache is fresh, so an
+# identity check is enough to reuse the escaped text.
+_leaderboard_text_cache: Dict[str, Tuple[List[Dict], str]] = {}
+
+# LRU caches of a user's rank and achievements, reused for USER_CACHE_TTL
+# seconds while they flip between tabs: key -> (expires_at, value). Lookups
+# run in worker threads, hence the lock.
+USER_CACHE_SIZE = 5000
+USER_CACHE_TTL = 30
+_user_rank_cache: "OrderedDict[int, Tuple[float, UserRank]]" = OrderedDict()
+_user_achievements_cache: "OrderedDict[Tuple[int, int], Tuple[float, List[Dict]]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+# Static MarkdownV2 texts, built once at import
+_POINTS_HELP_TEXT = """
+🎯 *How to Earn Points*
+
+*Confession Activities:*
+• Submit confession: \\+10 points
+• Approved confession: \\+25 points
+• Each like received: \\+2 points
+• Featured confession: \\+50 points
+• 100\\+ likes bonus: \\+100 points
+
+*Comment Activities:*
+• Post comment: \\+5 points
+• Comment gets liked: \\+1 point
+• Quality comment: \\+20 points
+• Start discussion: \\+10 points
+
+*Daily Activities:*
+• Daily login: \\+2 points
+• Consecutive days \\(3\\+\\): \\+5 points/day
+• Weekly streak: \\+25 points
+• Monthly streak: \\+100 points
+
+*Social Activities:*
+• Give reactions: \\+1 point
+• Help others: \\+10 points
+• Positive interaction: \\+5 points
+
+*Special Bonuses:*
+• First confession: \\+50 points
+• Milestones: \\+100 points
+• Achievements: Varies
+
+*Rank Up Rewards:*
+• Each rank up: \\+50 points
+• Special ranks: Extra bonuses
+
+🚫 *Point Penalties:*
+• Content rejected: \\-5 points
+• Spam detected: \\-15 points
+• Inappropriate content: \\-25 points
+
+💡 *Tips:*
+• Be active daily for streak bonuses
+• Write quality, thoughtful content
+• Engage positively with others
+• Help build the community
+
+The more you contribute, the faster you'll climb the ranks\\!
+"""
+
+_LEADERBOARD_MENU_TEXT = """
+🏆 *Community Leaderboard*
+
+Choose a timeframe to view the top contributors:
+
+📅 *Weekly:* Top performers this week
+📆 *Monthly:* Top performers this month  
+⭐ *All Time:* Highest ranking members ever
+
+All rankings are completely anonymous to protect your privacy\\!
+"""
+
+# Rank position emojis for the top of each leaderboard
+_POSITION_EMOJIS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+# Perk name -> renderer for its line in the rank display; unknown perks are skipped
+_PERK_TEMPLATES = {
+    "daily_confessions": lambda value: f"• Daily confessions: {value}\n",
+    "priority_review": lambda value: "• Priority review ⚡\n",
+    "comment_highlight": lambda value: "• Comment highlighting ✨\n",
+    "featured_chance": lambda value: f"• Featured post chance: {int(value*100)}%\n",
+    "exclusive_categories": lambda value: "• Exclusive categories access 🔓\n",
+    "custom_emoji": lambda value: "• Custom emoji reactions 😎\n",
+    "legend_badge": lambda value: "• Legend badge 👑\n",
+    "unlimited_daily": lambda value: "• Unlimited daily confessions ♾️\n",
+    "all_perks": lambda value: "• All available perks unlocked 🌟\n",
+}
+
+# Inline keyboards are immutable, so every handler shares one instance
+_KB_RANKING = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📊 My Rank", callback_data="rank_my_rank"),
+        InlineKeyboardButton("🏆 Leaderboard", callback_data="rank_leaderboard")
+    ],
+    [
+        InlineKeyboardButton("🎯 Achievements", callback_data="rank_achievements"),
+        InlineKeyboardButton("📈 Progress", callback_data="rank_progress")
+    ],
+    [
+        InlineKeyboardButton("🔍 How to Earn Points", callback_data="rank_help"),
+        InlineKeyboardButton("🏠 Main Menu", callback_data="main_menu")
+    ]
+])
+
+# Timeframe buttons are shared by the leaderboard menu and every board view
+_BTN_WEEKLY = InlineKeyboardButton("📅 Weekly", callback_data="leaderboard_weekly")
+_BTN_MONTHLY = InlineKeyboardButton("📆 Monthly", callback_data="leaderboard_monthly")
+_BTN_ALLTIME = InlineKeyboardButton("⭐ All Time", callback_data="leaderboard_alltime")
+
+_KB_LEADERBOARD_MENU = InlineKeyboardMarkup([
+    [_BTN_WEEKLY, _BTN_MONTHLY],
+    [
+        _BTN_ALLTIME,
+        InlineKeyboardButton("🔙 Back", callback_data="rank_menu")
+    ]
+])
+
+# One switcher markup serves all three timeframes
+_KB_LEADERBOARD = InlineKeyboardMarkup([
+    [_BTN_WEEKLY, _BTN_MONTHLY, _BTN_ALLTIME],
+    [
+        InlineKeyboardButton("🔙 Back to Rankings", callback_data="rank_menu")
+    ]
+])
+
+_KB_ACHIEVEMENTS = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("🎯 More Achievements", callback_data="achievements_all"),
+        InlineKeyboardButton("📊 My Rank", callback_data="rank_my_rank")
+    ],
+    [
+        InlineKeyboardButton("🔙 Back to Rankings", callback_data="rank_menu")
+    ]
+])
+
+_KB_POINTS_HELP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📊 My Rank", callback_data="rank_my_rank"),
+        InlineKeyboardButton("🏆 Leaderboard", callback_data="rank_leaderboard")
+    ],
+    [
+        InlineKeyboardButton("🔙 Back to Rankings", callback_data="rank_menu")
+    ]
+])
+
+_KB_PROGRESS = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("🎯 All Achievements", callback_data="rank_achievements"),
+        InlineKeyboardButton("🏆 Leaderboard", callback_data="rank_leaderboard")
+    ],
+    [
+        InlineKeyboardButton("🔙 Back to Rankings", callback_data="rank_menu")
+    ]
+])
+
+_KB_RANK_UP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🏆 View My Rank", callback_data="rank_my_rank")],
+    [InlineKeyboardButton("🎯 See Achievements", callback_data="rank_achievements")]
+])
+
+_KB_ACHIEVEMENT_EARNED = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🎯 View All Achievements", callback_data="rank_achievements")],
+    [InlineKeyboardButton("📊 Check My Rank", callback_data="rank_my_rank")]
+])
+
+# Every bar for the lengths the screens use, indexed by filled cell count
+_BARS = {length: tuple("█" * filled + "░" * (length - filled) for filled in range(length + 1))
+         for length in (10, 12, 15)}
+
+# Main reply keyboard restored when leaving the ranking screens
+_MAIN_MENU_MARKUP = ReplyKeyboardMarkup([
+    ["🙊 Confess/Ask Question", "📰 View Recent Confessions"],
+    ["🏆 My Rank", "📊 My Stats"],
+    ["📅 Daily Digest", "📞 Contact Admin"],
+    ["❓ Help/About"]
+], resize_keyboard=True)
+
+# Conversation state dropped when returning to the main menu
+_KEYS_TO_CLEAR = frozenset({
+    'state', 'confession_content', 'selected_category', 
+    'comment_post_id', 'comment_content', 'admin_action',
+    'viewing_post_id', 'reply_to_comment_id', 'current_page',
+    'contact_admin_message'
+})
+
 class RankingUI:
     """UI components for the ranking system"""
     
     @staticmethod
     def create_progress_bar(current: int, maximum: int, length: int = 10) -> str:
         """Create a text progress bar"""
+        bars = _BARS.get(length)
         if maximum == 0:
-            return "█" * length
+            return bars[length] if bars else "█" * length
         
         filled = int((current / maximum) * length)
+        if bars and 0 <= filled <= length:
+            return bars[filled]
         empty = length - filled
         return "█" * filled + "░" * empty
     
@@ -39,8 +245,8 @@ class RankingUI:
         rank_text = f"""
 🏆 *Your Current Rank*
 
-{escape_markdown_text(user_rank.rank_emoji)} **{escape_markdown_text(user_rank.rank_name)}**
-{escape_markdown_text('⭐' if user_rank.is_special_rank else '📊')} {user_rank.total_points:,} points
+{user_rank.rank_emoji_escaped} **{user_rank.rank_name_escaped}**
+{_escape('⭐' if user_rank.is_special_rank else '📊')} {user_rank.total_points:,} points
 
 📈 *Progress to Next Rank*
 {progress_bar}
@@ -53,89 +259,48 @@ class RankingUI:
         
         # Show special perks if any
         if user_rank.special_perks:
-            perks_text = "🎁 *Special Perks*\n"
+            perks_parts = ["\n🎁 *Special Perks*\n"]
             for perk, value in user_rank.special_perks.items():
-                if perk == "daily_confessions":
-                    perks_text += f"• Daily confessions: {value}\n"
-                elif perk == "priority_review":
-                    perks_text += "• Priority review ⚡\n"
-                elif perk == "comment_highlight":
-                    perks_text += "• Comment highlighting ✨\n"
-                elif perk == "featured_chance":
-                    perks_text += f"• Featured post chance: {int(value*100)}%\n"
-                elif perk == "exclusive_categories":
-                    perks_text += "• Exclusive categories access 🔓\n"
-                elif perk == "custom_emoji":
-                    perks_text += "• Custom emoji reactions 😎\n"
-                elif perk == "legend_badge":
-                    perks_text += "• Legend badge 👑\n"
-                elif perk == "unlimited_daily":
-                    perks_text += "• Unlimited daily confessions ♾️\n"
-                elif perk == "all_perks":
-                    perks_text += "• All available perks unlocked 🌟\n"
+                render = _PERK_TEMPLATES.get(perk)
+                if render:
+                    perks_parts.append(render(value))
             
-            rank_text += f"\n{perks_text}"
+            rank_text += "".join(perks_parts)
         
         return rank_text
     
     @staticmethod
     def create_ranking_keyboard() -> InlineKeyboardMarkup:
         """Create inline keyboard for ranking navigation"""
-        keyboard = [
-            [
-                InlineKeyboardButton("📊 My Rank", callback_data="rank_my_rank"),
-                InlineKeyboardButton("🏆 Leaderboard", callback_data="rank_leaderboard")
-            ],
-            [
-                InlineKeyboardButton("🎯 Achievements", callback_data="rank_achievements"),
-                InlineKeyboardButton("📈 Progress", callback_data="rank_progress")
-            ],
-            [
-                InlineKeyboardButton("🔍 How to Earn Points", callback_data="rank_help"),
-                InlineKeyboardButton("🏠 Main Menu", callback_data="main_menu")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return _KB_RANKING
     
     @staticmethod
     def create_leaderboard_keyboard() -> InlineKeyboardMarkup:
         """Create keyboard for leaderboard timeframes"""
-        keyboard = [
-            [
-                InlineKeyboardButton("📅 Weekly", callback_data="leaderboard_weekly"),
-                InlineKeyboardButton("📆 Monthly", callback_data="leaderboard_monthly")
-            ],
-            [
-                InlineKeyboardButton("⭐ All Time", callback_data="leaderboard_alltime"),
-                InlineKeyboardButton("🔙 Back", callback_data="rank_menu")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return _KB_LEADERBOARD_MENU
     
     @staticmethod
     def format_leaderboard(leaderboard: List[Dict], timeframe: str) -> str:
         """Format leaderboard for display"""
+        header = f"📊 *{timeframe.title()} Leaderboard*\n\n"
         if not leaderboard:
-            return f"📊 *{timeframe.title()} Leaderboard*\n\nNo data available yet\\. Be the first to earn points\\!"
+            return f"{header}No data available yet\\. Be the first to earn points\\!"
         
-        # Rank position emojis
-        position_emojis = {1: "🥇", 2: "🥈", 3: "🥉"}
-        
-        leaderboard_text = f"📊 *{timeframe.title()} Leaderboard*\n\n"
+        parts = [header]
         
         for entry in leaderboard:
             position = entry['position']
-            emoji = position_emojis.get(position, f"{position}\\.")
+            emoji = _POSITION_EMOJIS.get(position, f"{position}\\.")
             
-            leaderboard_text += (
-                f"{emoji} {escape_markdown_text(entry['rank_emoji'])} "
-                f"*{escape_markdown_text(entry['anonymous_name'])}*\n"
-                f"   {escape_markdown_text(entry['rank_name'])} • "
+            parts.append(
+                f"{emoji} {entry['rank_emoji_escaped']} "
+                f"*{_escape(entry['anonymous_name'])}*\n"
+                f"   {entry['rank_name_escaped']} • "
                 f"{entry['points']:,} points\n\n"
             )
         
-        leaderboard_text += "🎯 Keep earning points to climb the ranks\\!"
-        return leaderboard_text
+        parts.append("🎯 Keep earning points to climb the ranks\\!")
+        return "".join(parts)
     
     @staticmethod
     def format_achievements(achievements: List[Dict]) -> str:
@@ -143,85 +308,84 @@ class RankingUI:
         if not achievements:
             return "🎯 *Your Achievements*\n\nNo achievements yet\\. Start earning points to unlock your first achievement\\!"
         
-        achievements_text = f"🎯 *Your Achievements* \\({len(achievements)} earned\\)\n\n"
+        parts = [f"🎯 *Your Achievements* \\({len(achievements)} earned\\)\n\n"]
         
         for achievement in achievements[:10]:  # Show top 10
             special_mark = "⭐" if achievement['is_special'] else "🏆"
             date_str = achievement['date'][:10] if achievement['date'] else "Unknown"
+            # Name and description always travel together, so escape them as one string
+            name, description = _escape(
+                f"{achievement['name'] or ''}{_FIELD_SEP}{achievement['description'] or ''}"
+            ).split(_FIELD_SEP)
             
-            achievements_text += (
-                f"{special_mark} *{escape_markdown_text(achievement['name'])}*\n"
-                f"   {escape_markdown_text(achievement['description'])}\n"
-                f"   \\+{achievement['points']} points • {escape_markdown_text(date_str)}\n\n"
+            parts.append(
+                f"{special_mark} *{name}*\n"
+                f"   {description}\n"
+                f"   \\+{achievement['points']} points • {_escape(date_str)}\n\n"
             )
         
         if len(achievements) > 10:
-            achievements_text += f"\\.\\.\\. and {len(achievements) - 10} more\\!\n"
+            parts.append(f"\\.\\.\\. and {len(achievements) - 10} more\\!\n")
         
-        return achievements_text
+        return "".join(parts)
     
     @staticmethod
     def format_points_help() -> str:
         """Format help text for earning points"""
-        return """
-🎯 *How to Earn Points*
-
-*Confession Activities:*
-• Submit confession: \\+10 points
-• Approved confession: \\+25 points
-• Each like received: \\+2 points
-• Featured confession: \\+50 points
-• 100\\+ likes bonus: \\+100 points
-
-*Comment Activities:*
-• Post comment: \\+5 points
-• Comment gets liked: \\+1 point
-• Quality comment: \\+20 points
-• Start discussion: \\+10 points
-
-*Daily Activities:*
-• Daily login: \\+2 points
-• Consecutive days \\(3\\+\\): \\+5 points/day
-• Weekly streak: \\+25 points
-• Monthly streak: \\+100 points
-
-*Social Activities:*
-• Give reactions: \\+1 point
-• Help others: \\+10 points
-• Positive interaction: \\+5 points
-
-*Special Bonuses:*
-• First confession: \\+50 points
-• Milestones: \\+100 points
-• Achievements: Varies
-
-*Rank Up Rewards:*
-• Each rank up: \\+50 points
-• Special ranks: Extra bonuses
-
-🚫 *Point Penalties:*
-• Content rejected: \\-5 points
-• Spam detected: \\-15 points
-• Inappropriate content: \\-25 points
-
-💡 *Tips:*
-• Be active daily for streak bonuses
-• Write quality, thoughtful content
-• Engage positively with others
-• Help build the community
-
-The more you contribute, the faster you'll climb the ranks\\!
-"""
+        return _POINTS_HELP_TEXT
+
+def _user_cache_get(cache: OrderedDict, key):
+    """Return a fresh cached value, or None (dropping the entry if it expired)"""
+    with _user_cache_lock:
+        cached = cache.get(key)
+        if cached:
+            expires_at, value = cached
+            if expires_at > time.monotonic():
+                cache.move_to_end(key)
+                return value
+            del cache[key]
+    return None
+
+def _user_cache_put(cache: OrderedDict, key, value):
+    """Cache a value for USER_CACHE_TTL seconds, evicting the least recently used entry"""
+    with _user_cache_lock:
+        cache[key] = (time.monotonic() + USER_CACHE_TTL, value)
+        cache.move_to_end(key)
+        if len(cache) > USER_CACHE_SIZE:
+            cache.popitem(last=False)
+
+def _cached_user_rank(user_id: int) -> Optional[UserRank]:
+    """Get a user's rank, reusing a recent lookup"""
+    user_rank = _user_cache_get(_user_rank_cache, user_id)
+    if user_rank:
+        return user_rank
+    user_rank = ranking_manager.get_user_rank(user_id)
+    if user_rank:
+        _user_cache_put(_user_rank_cache, user_id, user_rank)
+    return user_rank
+
+def _cached_user_achievements(user_id: int, limit: int = 20) -> List[Dict]:
+    """Get a user's achievements, reusing a recent lookup"""
+    key = (user_id, limit)
+    achievements = _user_cache_get(_user_achievements_cache, key)
+    if achievements is not None:
+        return achievements
+    achievements = ranking_manager.get_user_achievements(user_id, limit=limit)
+    _user_cache_put(_user_achievements_cache, key, achievements)
+    return achievements
+
+def invalidate_user_cache(user_id: int):
+    """Drop cached rank and achievements after the user's points change"""
+    with _user_cache_lock:
+        _user_rank_cache.pop(user_id, None)
+        for key in [key for key in _user_achievements_cache if key[0] == user_id]:
+            del _user_achievements_cache[key]
 
 async def show_ranking_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show main ranking menu"""
     user_id = update.effective_user.id
-    user_rank = ranking_manager.get_user_rank(user_id)
-    
-    if not user_rank:
-        # Initialize user ranking
-        ranking_manager.initialize_user_ranking(user_id)
-        user_rank = ranking_manager.get_user_rank(user_id)
+    # get_user_rank initializes first-time users itself
+    user_rank = _cached_user_rank(user_id)
     
     if not user_rank:
         await update.message.reply_text("❗ Error loading ranking information. Please try again.")
@@ -251,17 +415,7 @@ async def show_leaderboard_menu(update: Update, context: ContextTypes.DEFAULT_TY
     """Show leaderboard selection menu"""
     keyboard = RankingUI.create_leaderboard_keyboard()
     
-    text = """
-🏆 *Community Leaderboard*
-
-Choose a timeframe to view the top contributors:
-
-📅 *Weekly:* Top performers this week
-📆 *Monthly:* Top performers this month  
-⭐ *All Time:* Highest ranking members ever
-
-All rankings are completely anonymous to protect your privacy\\!
-"""
+    text = _LEADERBOARD_MENU_TEXT
     
     if update.callback_query:
         await update.callback_query.edit_message_text(
@@ -279,90 +433,63 @@ All rankings are completely anonymous to protect your privacy\\!
 async def show_leaderboard(update: Update, context: ContextTypes.DEFAULT_TYPE, timeframe: str):
     """Show leaderboard for specific timeframe"""
     leaderboard = ranking_manager.get_leaderboard(timeframe, limit=10)
-    leaderboard_text = RankingUI.format_leaderboard(leaderboard, timeframe)
-    
-    keyboard = [
-        [
-            InlineKeyboardButton("📅 Weekly", callback_data="leaderboard_weekly"),
-            InlineKeyboardButton("📆 Monthly", callback_data="leaderboard_monthly"),
-            InlineKeyboardButton("⭐ All Time", callback_data="leaderboard_alltime")
-        ],
-        [
-            InlineKeyboardButton("🔙 Back to Rankings", callback_data="rank_menu")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    cached = _leaderboard_text_cache.get(timeframe)
+    if cached and cached[0] is leaderboard:
+        leaderboard_text = cached[1]
+    else:
+        leaderboard_text = RankingUI.format_leaderboard(leaderboard, timeframe)
+        _leaderboard_text_cache[timeframe] = (leaderboard, leaderboard_text)
     
     if update.callback_query:
         await update.callback_query.edit_message_text(
             leaderboard_text,
             parse_mode="MarkdownV2",
-            reply_markup=reply_markup
+            reply_markup=_KB_LEADERBOARD
         )
 
 async def show_user_achievements(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show user's achievements"""
     user_id = update.effective_user.id
-    achievements = ranking_manager.get_user_achievements(user_id)
+    achievements = _cached_user_achievements(user_id)
     achievements_text = RankingUI.format_achievements(achievements)
     
-    keyboard = [
-        [
-            InlineKeyboardButton("🎯 More Achievements", callback_data="achievements_all"),
-            InlineKeyboardButton("📊 My Rank", callback_data="rank_my_rank")
-        ],
-        [
-            InlineKeyboardButton("🔙 Back to Rankings", callback_data="rank_menu")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     if update.callback_query:
         await update.callback_query.edit_message_text(
             achievements_text,
             parse_mode="MarkdownV2",
-            reply_markup=reply_markup
+            reply_markup=_KB_ACHIEVEMENTS
         )
 
 async def show_points_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show help for earning points"""
     help_text = RankingUI.format_points_help()
     
-    keyboard = [
-        [
-            InlineKeyboardButton("📊 My Rank", callback_data="rank_my_rank"),
-            InlineKeyboardButton("🏆 Leaderboard", callback_data="rank_leaderboard")
-        ],
-        [
-            InlineKeyboardButton("🔙 Back to Rankings", callback_data="rank_menu")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     if update.callback_query:
         await update.callback_query.edit_message_text(
             help_text,
             parse_mode="MarkdownV2",
-            reply_markup=reply_markup
+            reply_markup=_KB_POINTS_HELP
         )
 
 async def show_user_progress(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show detailed user progress"""
     user_id = update.effective_user.id
-    user_rank = ranking_manager.get_user_rank(user_id)
+    # Fetch rank and recent achievements off the event loop; the manager's
+    # lock keeps its shared connection safe across threads
+    user_rank, recent_achievements = await asyncio.gather(
+        asyncio.to_thread(_cached_user_rank, user_id),
+        asyncio.to_thread(_cached_user_achievements, user_id, 5)
+    )
     
     if not user_rank:
         await update.callback_query.answer("Error loading progress information.")
         return
     
-    # Get recent achievements
-    recent_achievements = ranking_manager.get_user_achievements(user_id, limit=5)
-    
     progress_text = f"""
 📈 *Your Progress Report*
 
 🏆 *Current Status:*
-{escape_markdown_text(user_rank.rank_emoji)} {escape_markdown_text(user_rank.rank_name)}
+{user_rank.rank_emoji_escaped} {user_rank.rank_name_escaped}
 {user_rank.total_points:,} total points earned
 
 📊 *Recent Activity:*
@@ -371,13 +498,13 @@ async def show_user_progress(update: Update, context: ContextTypes.DEFAULT_TYPE)
     if recent_achievements:
         progress_text += "\n🎯 *Recent Achievements:*\n"
         for achievement in recent_achievements[:3]:
-            progress_text += f"• {escape_markdown_text(achievement['name'])} \\(\\+{achievement['points']} pts\\)\n"
+            progress_text += f"• {_escape(achievement['name'])} \\(\\+{achievement['points']} pts\\)\n"
     else:
         progress_text += "\n🎯 No recent achievements\\. Keep engaging to earn more\\!\n"
     
     # Show next milestone
     if user_rank.points_to_next > 0:
-        progress_text += f"\n🎯 *Next Goal:*\n{user_rank.points_to_next:,} points to {escape_markdown_text(user_rank.rank_name)} rank\\!\n"
+        progress_text += f"\n🎯 *Next Goal:*\n{user_rank.points_to_next:,} points to {user_rank.rank_name_escaped} rank\\!\n"
     
     # Add progress bar
     progress_bar = RankingUI.create_progress_bar(
@@ -387,50 +514,34 @@ async def show_user_progress(update: Update, context: ContextTypes.DEFAULT_TYPE)
     )
     progress_text += f"\n📈 *Progress:*\n{progress_bar}\n"
     
-    keyboard = [
-        [
-            InlineKeyboardButton("🎯 All Achievements", callback_data="rank_achievements"),
-            InlineKeyboardButton("🏆 Leaderboard", callback_data="rank_leaderboard")
-        ],
-        [
-            InlineKeyboardButton("🔙 Back to Rankings", callback_data="rank_menu")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     if update.callback_query:
         await update.callback_query.edit_message_text(
             progress_text,
             parse_mode="MarkdownV2",
-            reply_markup=reply_markup
+            reply_markup=_KB_PROGRESS
         )
 
 async def notify_rank_up(context: ContextTypes.DEFAULT_TYPE, user_id: int, new_rank_name: str, new_rank_emoji: str):
     """Notify user about rank up"""
+    invalidate_user_cache(user_id)
     try:
         notification_text = f"""
 🎉 *RANK UP ACHIEVED\\!*
 
 Congratulations\\! You've been promoted to:
 
-{escape_markdown_text(new_rank_emoji)} **{escape_markdown_text(new_rank_name)}**
+{_escape(new_rank_emoji)} **{_escape(new_rank_name)}**
 
 Keep up the great work in our community\\!
 
 🎁 *\\+50 bonus points awarded*
 """
         
-        keyboard = [
-            [InlineKeyboardButton("🏆 View My Rank", callback_data="rank_my_rank")],
-            [InlineKeyboardButton("🎯 See Achievements", callback_data="rank_achievements")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await context.bot.send_message(
             chat_id=user_id,
             text=notification_text,
             parse_mode="MarkdownV2",
-            reply_markup=reply_markup
+            reply_markup=_KB_RANK_UP
         )
         
     except Exception as e:
@@ -439,34 +550,57 @@ Keep up the great work in our community\\!
 async def notify_achievement_earned(context: ContextTypes.DEFAULT_TYPE, user_id: int, 
                                   achievement_name: str, achievement_description: str, points: int):
     """Notify user about new achievement"""
+    invalidate_user_cache(user_id)
     try:
         notification_text = f"""
 🎯 *ACHIEVEMENT UNLOCKED\\!*
 
-{escape_markdown_text(achievement_name)}
+{_escape(achievement_name)}
 
-{escape_markdown_text(achievement_description)}
+{_escape(achievement_description)}
 
 🎁 *\\+{points} points earned*
 """
         
-        keyboard = [
-            [InlineKeyboardButton("🎯 View All Achievements", callback_data="rank_achievements")],
-            [InlineKeyboardButton("📊 Check My Rank", callback_data="rank_my_rank")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await context.bot.send_message(
             chat_id=user_id,
             text=notification_text,
             parse_mode="MarkdownV2",
-            reply_markup=reply_markup
+            reply_markup=_KB_ACHIEVEMENT_EARNED
         )
         
     except Exception as e:
         logger.error(f"Failed to send achievement notification to {user_id}: {e}")
 
+async def return_to_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Clear ranking state and bring back the main reply keyboard"""
+    # Clear user context and show main menu
+    for key in _KEYS_TO_CLEAR:
+        context.user_data.pop(key, None)
+    
+    await update.callback_query.edit_message_text("🏠 Returned to main menu\\. Please use the menu below\\.", parse_mode="MarkdownV2")
+    await context.bot.send_message(
+        chat_id=update.effective_chat.id,
+        text="What would you like to do next?",
+        reply_markup=_MAIN_MENU_MARKUP
+    )
+
 # Callback handlers for ranking system
+_CALLBACK_HANDLERS = {
+    "rank_menu": show_ranking_menu,
+    "rank_my_rank": show_ranking_menu,
+    "rank_leaderboard": show_leaderboard_menu,
+    "rank_achievements": show_user_achievements,
+    "rank_help": show_points_help,
+    "rank_progress": show_user_progress,
+    "main_menu": return_to_main_menu,
+}
+
+_LEADERBOARD_PREFIX = "leaderboard_"
+# Callback suffix -> the LEADERBOARD_COLUMNS key object itself, so the cache
+# lookups downstream hit on identity without interning client input
+_LEADERBOARD_TIMEFRAMES = {timeframe: timeframe for timeframe in LEADERBOARD_COLUMNS}
+
 async def ranking_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle ranking system callbacks"""
     query = update.callback_query
@@ -474,46 +608,13 @@ async def ranking_callback_handler(update: Update, context: ContextTypes.DEFAULT
     
     data = query.data
     
-    if data == "rank_menu" or data == "rank_my_rank":
-        await show_ranking_menu(update, context)
-    elif data == "rank_leaderboard":
-        await show_leaderboard_menu(update, context)
-    elif data.startswith("leaderboard_"):
-        timeframe = data.replace("leaderboard_", "")
+    handler = _CALLBACK_HANDLERS.get(data)
+    timeframe = (_LEADERBOARD_TIMEFRAMES.get(data[len(_LEADERBOARD_PREFIX):])
+                 if data.startswith(_LEADERBOARD_PREFIX) else None)
+    if handler:
+        await handler(update, context)
+    elif timeframe:
+        # Only known timeframes get this far, so the per-timeframe caches stay bounded
         await show_leaderboard(update, context, timeframe)
-    elif data == "rank_achievements":
-        await show_user_achievements(update, context)
-    elif data == "rank_help":
-        await show_points_help(update, context)
-    elif data == "rank_progress":
-        await show_user_progress(update, context)
-    elif data == "main_menu":
-        # Return to main menu - import needed functions
-        from telegram import ReplyKeyboardMarkup
-        
-        # Clear user context and show main menu
-        keys_to_clear = [
-            'state', 'confession_content', 'selected_category', 
-            'comment_post_id', 'comment_content', 'admin_action',
-            'viewing_post_id', 'reply_to_comment_id', 'current_page',
-            'contact_admin_message'
-        ]
-        for key in keys_to_clear:
-            context.user_data.pop(key, None)
-        
-        # Main menu options
-        MAIN_MENU = [
-            ["🙊 Confess/Ask Question", "📰 View Recent Confessions"],
-            ["🏆 My Rank", "📊 My Stats"],
-            ["📅 Daily Digest", "📞 Contact Admin"],
-            ["❓ Help/About"]
-        ]
-        
-        await query.edit_message_text("🏠 Returned to main menu\\. Please use the menu below\\.", parse_mode="MarkdownV2")
-        await context.bot.send_message(
-            chat_id=update.effective_chat.id,
-            text="What would you like to do next?",
-            reply_markup=ReplyKeyboardMarkup(MAIN_MENU, resize_keyboard=True)
-        )
     else:
         await query.answer("Unknown ranking option.")
@@ -50,16 +50,12 @@ def setup_ranking_system():
             print("❌ Ranking system test failed!")
             return False
             
-        # Step 3: Clean up test data
-        import sqlite3
-        from config import DB_PATH
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM user_rankings WHERE user_id = ?", (test_user_id,))
-            cursor.execute("DELETE FROM point_transactions WHERE user_id = ?", (test_user_id,))
-            conn.commit()
-        
-        print("🧹 Test data cleaned up")
+        # Step 3: Clean up test data on the manager's own connection so the
+        # cleanup cannot stall on a lock held by it
+        if ranking_manager.purge_user(test_user_id):
+            print("🧹 Test data cleaned up")
+        else:
+            print("⚠️ Failed to clean up test data")
         
         # Step 4: Show integration instructions
         print("\n" + "="*50)
@@ -1,47 +1,59 @@
-import sqlite3
-from config import DB_PATH
+from db_pool import pool, cached_query, invalidate_tables
 
 def save_submission(user_id, content, category):
     """Save a new submission to the database"""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with pool.get_connection() as conn:
             cursor = conn.cursor()
+            # User stats are bumped by the trg_posts_questions_asked trigger,
+            # so this one autocommitted statement is the whole write
             cursor.execute(
                 "INSERT INTO posts (content, category, user_id) VALUES (?, ?, ?)",
                 (content, category, user_id)
             )
             post_id = cursor.lastrowid
-            
-            # Update user stats
-            cursor.execute(
-                "UPDATE users SET questions_asked = questions_asked + 1 WHERE user_id = ?",
-                (user_id,)
-            )
-            conn.commit()
+            invalidate_tables('posts')
             return post_id, None
     except Exception as e:
         return None, f"Database error: {str(e)}"
 
-def get_pending_submissions():
-    """Get all submissions pending approval"""
-    with sqlite3.connect(DB_PATH) as conn:
+def get_pending_submissions(limit=50, before=None):
+    """Get a page of submissions pending approval, newest first
+    
+    Pass the last row's (timestamp, post_id) as before to fetch the next page.
+    Timestamps have one-second resolution, so post_id breaks ties and rows
+    sharing a timestamp across a page boundary are not skipped.
+    """
+    before_ts, before_id = before if before else (None, None)
+    with pool.get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM posts WHERE approved IS NULL ORDER BY timestamp DESC")
+        cursor.execute('''
+            SELECT post_id, content, category, timestamp, user_id, approved,
+                   channel_message_id, flagged, likes
+            FROM posts
+            WHERE approved IS NULL
+              AND (? IS NULL OR (timestamp, post_id) < (?, ?))
+            ORDER BY timestamp DESC, post_id DESC
+            LIMIT ?
+        ''', (before_ts, before_ts, before_id, limit))
         return cursor.fetchall()
 
+def count_pending_submissions():
+    """Count submissions pending approval"""
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM posts WHERE approved IS NULL")
+        return cursor.fetchone()[0]
+
+@cached_query(tables=('posts',))
 def get_recent_posts(limit=10):
     """Get recent approved posts with comment counts"""
-    with sqlite3.connect(DB_PATH) as conn:
+    with pool.get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
-            SELECT p.*, 
-                   COALESCE(c.comment_count, 0) as comment_count
+            SELECT p.post_id, p.content, p.category, p.timestamp, p.approved,
+                   p.user_id, p.comment_count
             FROM posts p
-            LEFT JOIN (
-                SELECT post_id, COUNT(*) as comment_count
-                FROM comments
-                GROUP BY post_id
-            ) c ON p.post_id = c.post_id
             WHERE p.approved = 1
             ORDER BY p.timestamp DESC
             LIMIT ?
@@ -50,53 +62,39 @@ def get_recent_posts(limit=10):
 
 def get_post_by_id(post_id):
     """Get a specific post by ID with comment count"""
-    with sqlite3.connect(DB_PATH) as conn:
+    with pool.get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
-            SELECT p.*, 
-                   COALESCE(c.comment_count, 0) as comment_count
+            SELECT p.post_id, p.content, p.category, p.timestamp, p.approved,
+                   p.user_id, p.comment_count
             FROM posts p
-            LEFT JOIN (
-                SELECT post_id, COUNT(*) as comment_count
-                FROM comments
-                GROUP BY post_id
-            ) c ON p.post_id = c.post_id
             WHERE p.post_id = ?
         ''', (post_id,))
         return cursor.fetchone()
 
+@cached_query(tables=('posts',))
 def get_todays_posts():
     """Get all approved posts from today"""
-    with sqlite3.connect(DB_PATH) as conn:
+    with pool.get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT p.post_id, p.content, p.category, p.timestamp, p.approved,
-                   COALESCE(c.comment_count, 0) as comment_count
+                   p.comment_count
             FROM posts p
-            LEFT JOIN (
-                SELECT post_id, COUNT(*) as comment_count
-                FROM comments
-                GROUP BY post_id
-            ) c ON p.post_id = c.post_id
             WHERE p.approved = 1 
-            AND date(p.timestamp) = date('now')
+            AND p.timestamp >= date('now') AND p.timestamp < date('now', '+1 day')
             ORDER BY p.timestamp DESC
         ''', ())
         return cursor.fetchall()
 
 def get_user_posts(user_id, limit=20):
     """Get user's confession history"""
-    with sqlite3.connect(DB_PATH) as conn:
+    with pool.get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT p.post_id, p.content, p.category, p.timestamp, p.approved,
-                   COALESCE(c.comment_count, 0) as comment_count
+                   p.comment_count
             FROM posts p
-            LEFT JOIN (
-                SELECT post_id, COUNT(*) as comment_count
-                FROM comments
-                GROUP BY post_id
-            ) c ON p.post_id = c.post_id
             WHERE p.user_id = ?
             ORDER BY p.timestamp DESC
             LIMIT ?
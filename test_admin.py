@@ -4,8 +4,8 @@ Admin command testing script
 This script tests the new admin functions we implemented
 """
 
-import sqlite3
-from config import DB_PATH, ADMIN_IDS
+from config import ADMIN_IDS
+from db_pool import pool, get_ro_conn
 
 def test_admin_functions():
     """Test all admin functions"""
@@ -31,7 +31,7 @@ def test_admin_functions():
         print(f"🔍 User {test_user_id} blocked status: {was_blocked}")
         
         # Check database structure
-        with sqlite3.connect(DB_PATH) as conn:
+        with get_ro_conn() as conn:
             cursor = conn.cursor()
             
             # Check tables
@@ -64,9 +64,11 @@ def create_test_data():
     print("\n🗂️ Creating test data...")
     
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with pool.get_connection() as conn:
             cursor = conn.cursor()
             
+            # Both inserts share one transaction and a single commit
+            cursor.execute("BEGIN")
             # Add a test user if not exists
             test_user_id = 999999999
             cursor.execute("""
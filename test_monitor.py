@@ -4,42 +4,34 @@ Test monitoring script for University Confession Bot
 This script helps monitor database activity during testing
 """
 
-import sqlite3
 import time
 from datetime import datetime
-from config import DB_PATH
+from db_pool import get_ro_conn
 
 def show_stats():
     """Show current database statistics"""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with get_ro_conn() as conn:
             cursor = conn.cursor()
             
-            # Get user count
-            cursor.execute("SELECT COUNT(*) FROM users")
-            users = cursor.fetchone()[0]
-            
-            # Get posts by status
-            cursor.execute("SELECT COUNT(*) FROM posts WHERE status = 'pending' OR status IS NULL")
-            pending_posts = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM posts WHERE status = 'approved'")
-            approved_posts = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM posts WHERE status = 'rejected'")
-            rejected_posts = cursor.fetchone()[0]
-            
-            # Get comments
-            cursor.execute("SELECT COUNT(*) FROM comments")
-            comments = cursor.fetchone()[0]
-            
-            # Get reports
-            cursor.execute("SELECT COUNT(*) FROM reports")
-            reports = cursor.fetchone()[0]
-            
-            # Get admin messages
-            cursor.execute("SELECT COUNT(*) FROM admin_messages")
-            admin_messages = cursor.fetchone()[0]
+            # All counters in one statement; the posts statuses share one pass
+            cursor.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM users),
+                    p.pending, p.approved, p.rejected,
+                    (SELECT COUNT(*) FROM comments),
+                    (SELECT COUNT(*) FROM reports),
+                    (SELECT COUNT(*) FROM admin_messages)
+                FROM (
+                    SELECT
+                        COALESCE(SUM(status = 'pending' OR status IS NULL), 0) AS pending,
+                        COALESCE(SUM(status = 'approved'), 0) AS approved,
+                        COALESCE(SUM(status = 'rejected'), 0) AS rejected
+                    FROM posts
+                ) p
+            """)
+            (users, pending_posts, approved_posts, rejected_posts,
+             comments, reports, admin_messages) = cursor.fetchone()
             
             print(f"\n📊 Database Status - {datetime.now().strftime('%H:%M:%S')}")
             print("=" * 50)
@@ -59,41 +51,53 @@ def show_stats():
 def show_recent_activity():
     """Show recent database activity"""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with get_ro_conn() as conn:
             cursor = conn.cursor()
             
             print(f"\n📈 Recent Activity:")
             print("-" * 30)
             
+            # Previews, fallbacks and short timestamps are computed in SQL so
+            # only the displayed text crosses over from SQLite
+            
             # Recent users
-            cursor.execute("SELECT user_id, first_name, join_date FROM users ORDER BY join_date DESC LIMIT 3")
+            cursor.execute("""
+                SELECT user_id, COALESCE(NULLIF(first_name, ''), 'No name'),
+                       COALESCE(NULLIF(substr(join_date, 1, 16), ''), 'Unknown')
+                FROM users ORDER BY join_date DESC LIMIT 3
+            """)
             recent_users = cursor.fetchall()
             if recent_users:
                 print("👤 Recent Users:")
-                for user in recent_users:
-                    user_id, name, join_date = user
-                    print(f"   - {name or 'No name'} (ID: {user_id}) - {join_date[:16] if join_date else 'Unknown'}")
+                for user_id, name, join_date in recent_users:
+                    print(f"   - {name} (ID: {user_id}) - {join_date}")
             
             # Recent posts
-            cursor.execute("SELECT post_id, content, status, timestamp FROM posts ORDER BY timestamp DESC LIMIT 3")
+            cursor.execute("""
+                SELECT post_id,
+                       substr(content, 1, 50) || CASE WHEN length(content) > 50 THEN '...' ELSE '' END,
+                       COALESCE(NULLIF(status, ''), 'pending'),
+                       COALESCE(NULLIF(substr(timestamp, 1, 16), ''), 'Unknown')
+                FROM posts ORDER BY timestamp DESC LIMIT 3
+            """)
             recent_posts = cursor.fetchall()
             if recent_posts:
                 print("\n📝 Recent Posts:")
-                for post in recent_posts:
-                    post_id, content, status, timestamp = post
-                    preview = content[:50] + "..." if len(content) > 50 else content
-                    status_text = status if status else "pending"
-                    print(f"   - #{post_id}: {preview} ({status_text}) - {timestamp[:16] if timestamp else 'Unknown'}")
+                for post_id, preview, status_text, timestamp in recent_posts:
+                    print(f"   - #{post_id}: {preview} ({status_text}) - {timestamp}")
             
             # Recent comments
-            cursor.execute("SELECT comment_id, post_id, content, timestamp FROM comments ORDER BY timestamp DESC LIMIT 3")
+            cursor.execute("""
+                SELECT comment_id, post_id,
+                       substr(content, 1, 40) || CASE WHEN length(content) > 40 THEN '...' ELSE '' END,
+                       COALESCE(NULLIF(substr(timestamp, 1, 16), ''), 'Unknown')
+                FROM comments ORDER BY timestamp DESC LIMIT 3
+            """)
             recent_comments = cursor.fetchall()
             if recent_comments:
                 print("\n💬 Recent Comments:")
-                for comment in recent_comments:
-                    comment_id, post_id, content, timestamp = comment
-                    preview = content[:40] + "..." if len(content) > 40 else content
-                    print(f"   - #{comment_id} (Post #{post_id}): {preview} - {timestamp[:16] if timestamp else 'Unknown'}")
+                for comment_id, post_id, preview, timestamp in recent_comments:
+                    print(f"   - #{comment_id} (Post #{post_id}): {preview} - {timestamp}")
             
             print("-" * 30)
             
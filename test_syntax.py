@@ -8,7 +8,8 @@ def test_syntax():
     try:
         # Test compilation
         print("🔍 Testing bot.py compilation...")
-        with open('bot.py', 'r', encoding='utf-8') as f:
+        # compile() takes the raw bytes and decodes them itself
+        with open('bot.py', 'rb') as f:
             source_code = f.read()
         
         compile(source_code, 'bot.py', 'exec')
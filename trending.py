@@ -160,7 +160,7 @@ def get_popular_today_posts(limit: int = 15) -> List[Tuple]:
                 FROM posts p 
                 LEFT JOIN comments c ON p.post_id = c.post_id 
                 WHERE p.approved = 1 
-                AND DATE(p.timestamp) = DATE('now')
+                AND p.timestamp >= DATE('now') AND p.timestamp < DATE('now', '+1 day')
                 GROUP BY p.post_id 
                 ORDER BY popularity_score DESC, comment_count DESC, p.timestamp DESC 
                 LIMIT ?
@@ -1,20 +1,42 @@
 import re
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
 from config import SPAM_WORDS
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+_UTC = timezone.utc
+
+# All spam keywords in one automaton, so a text is scanned once however long the list is
+_SPAM_AUTOMATON = None
+if AHOCORASICK_AVAILABLE and SPAM_WORDS:
+    _SPAM_AUTOMATON = ahocorasick.Automaton()
+    for _spam_word in SPAM_WORDS:
+        _SPAM_AUTOMATON.add_word(_spam_word.lower(), _spam_word)
+    _SPAM_AUTOMATON.make_automaton()
+
+# Lowercased once for the substring fallback, matching the automaton's keys
+_SPAM_WORDS_LOWER = tuple(spam_word.lower() for spam_word in SPAM_WORDS)
+
 def sanitize_content(text):
     """Sanitize and validate content"""
-    if not text:
+    # Cheapest checks first. Collapsing whitespace only shortens the text,
+    # so anything already under the minimum can be rejected untouched.
+    if not text or len(text) < 10:
         return None
     
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE_PATTERN.sub(' ', text).strip()
     
-    # Check for spam
-    if is_spam(text):
-        return None
-    
-    # Basic length check
-    if len(text) < 10:
+    # Basic length check, then the spam scan
+    if len(text) < 10 or is_spam(text):
         return None
         
     return text
@@ -24,50 +46,72 @@ def is_spam(text):
     if not text:
         return False
     text_lower = text.lower()
-    return any(spam_word in text_lower for spam_word in SPAM_WORDS)
+    if _SPAM_AUTOMATON is not None:
+        # Stops at the first keyword found
+        return any(True for _ in _SPAM_AUTOMATON.iter(text_lower))
+    return any(spam_word in text_lower for spam_word in _SPAM_WORDS_LOWER)
+
+# MarkdownV2 special characters mapped to their escaped form, for one str.translate pass
+_MARKDOWN_V2_ESCAPES = str.maketrans({char: f'\\{char}' for char in r'_*[]()~`>#+-=|{}.!'})
 
 def escape_markdown_text(text):
     """Escape text for MarkdownV2"""
     if not text:
         return ""
     # Convert to string if it's not already a string
-    text = str(text)
-    escape_chars = r'_*[]()~`>#+-=|{}.!'
-    for char in escape_chars:
-        text = text.replace(char, f'\\{char}')
-    return text
+    return str(text).translate(_MARKDOWN_V2_ESCAPES)
 
 def truncate_text(text, max_length):
     """Truncate text to specified length"""
     if not text:
         return ""
     # Convert to string if it's not already a string
-    text = str(text)
+    if type(text) is not str:
+        text = str(text)
     if len(text) <= max_length:
         return text
     return text[:max_length-3] + "..."
 
+# fromisoformat only understands a trailing 'Z' from Python 3.11 on
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+def _parse_iso_datetime(value):
+    """datetime.fromisoformat that accepts a trailing 'Z' on every Python version"""
+    if not _FROMISOFORMAT_ACCEPTS_Z and value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+# The same timestamps are rendered for every viewer of a post, so formatted
+# results are cached on the raw value (bounded, as the inputs are unbounded)
+@lru_cache(maxsize=4096)
 def format_timestamp(timestamp_str):
     """Format timestamp for display"""
+    # Non-string values (NULL columns included) are shown as-is
+    if not isinstance(timestamp_str, str):
+        return escape_markdown_text(str(timestamp_str))
     try:
-        from datetime import datetime
-        dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+        dt = _parse_iso_datetime(timestamp_str)
         formatted = dt.strftime('%Y-%m-%d %H:%M')
-        # Escape markdown characters in the formatted timestamp
-        return escape_markdown_text(formatted)
-    except:
-        return escape_markdown_text(str(timestamp_str))
+    except ValueError:
+        return escape_markdown_text(timestamp_str)
+    # Escape markdown characters in the formatted timestamp
+    return escape_markdown_text(formatted)
 
+@lru_cache(maxsize=4096)
 def format_join_date(join_date_str):
     """Format join date for display"""
+    # Non-string values (NULL columns included) are shown as-is
+    if not isinstance(join_date_str, str):
+        return escape_markdown_text(str(join_date_str))
     try:
-        from datetime import datetime
-        dt = datetime.fromisoformat(join_date_str.replace('Z', '+00:00'))
+        dt = _parse_iso_datetime(join_date_str)
         formatted = dt.strftime('%B %d, %Y')
-        # Escape markdown characters in the formatted date
-        return escape_markdown_text(formatted)
-    except:
-        return escape_markdown_text(str(join_date_str))
+    except ValueError:
+        return escape_markdown_text(join_date_str)
+    # Escape markdown characters in the formatted date
+    return escape_markdown_text(formatted)
+
+_HASHTAG_EXTRACT_PATTERN = re.compile(r'#(\w{2,})')
 
 def extract_hashtags(text):
     """Extract hashtags from text content"""
@@ -75,16 +119,10 @@ def extract_hashtags(text):
         return []
     
     # Find hashtags - word characters after #, minimum 2 characters
-    hashtags = re.findall(r'#(\w{2,})', text.lower())
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_hashtags = []
-    for tag in hashtags:
-        if tag not in seen:
-            seen.add(tag)
-            unique_hashtags.append(tag)
-    
-    return unique_hashtags
+    hashtags = _HASHTAG_EXTRACT_PATTERN.findall(text.lower())
+    # Remove duplicates while preserving order; the same tags recur across
+    # posts, so interning lets every occurrence share one string object
+    return [sys.intern(tag) for tag in dict.fromkeys(hashtags)]
 
 def format_hashtags(hashtags):
     """Format hashtags for display"""
@@ -92,41 +130,32 @@ def format_hashtags(hashtags):
         return ""
     if isinstance(hashtags, str):
         hashtags = hashtags.split(',') if hashtags else []
-    return " ".join([f"#{tag.strip()}" for tag in hashtags if tag.strip()])
+    return " ".join(f"#{stripped}" for tag in hashtags if (stripped := tag.strip()))
+
+_HASHTAG_PATTERN = re.compile(r'#(\w+)')
 
 def escape_hashtags(text):
     """Escape hashtags in text for MarkdownV2"""
     if not text:
         return text
     # Escape # in hashtags for MarkdownV2
-    return re.sub(r'#(\w+)', r'\\#\1', text)
+    return _HASHTAG_PATTERN.sub(r'\\#\1', text)
+
+# Largest unit first; the first one with a non-zero count is shown
+_TIME_UNITS = ((86400, 'day'), (3600, 'hour'), (60, 'minute'))
 
 def format_time_ago(dt):
     """Format a datetime object to show time ago (e.g., '2h ago', '1d ago')"""
-    from datetime import datetime, timezone
-    
     # Make sure we're working with timezone-aware datetimes
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
+        dt = dt.replace(tzinfo=_UTC)
     
-    now = datetime.now(timezone.utc)
+    now = datetime.now(_UTC)
     diff = now - dt
+    seconds = diff.days * 86400 + diff.seconds
     
-    days = diff.days
-    hours = diff.seconds // 3600
-    minutes = (diff.seconds // 60) % 60
-    
-    if days > 0:
-        if days == 1:
-            return "1 day ago"
-        return f"{days} days ago"
-    elif hours > 0:
-        if hours == 1:
-            return "1 hour ago"
-        return f"{hours} hours ago"
-    elif minutes > 0:
-        if minutes == 1:
-            return "1 minute ago"
-        return f"{minutes} minutes ago"
-    else:
-        return "just now"
+    for unit_seconds, unit_name in _TIME_UNITS:
+        count = seconds // unit_seconds
+        if count > 0:
+            return f"{count} {unit_name}{'' if count == 1 else 's'} ago"
+    return "just now"
@@ -6,17 +6,16 @@ Verify bot.py syntax and functionality
 import sys
 import os
 
+from verify_bot_setup import load_and_compile_bot
+
 def verify_bot():
     """Verify the bot can be imported and started"""
     try:
         print("🔍 Checking bot.py syntax...")
         
         # Try to compile the bot.py file
-        with open('bot.py', 'r') as f:
-            source = f.read()
-        
         try:
-            compile(source, 'bot.py', 'exec')
+            load_and_compile_bot()
             print("✅ Bot.py syntax is correct!")
         except SyntaxError as e:
             print(f"❌ Syntax error in bot.py: {e}")
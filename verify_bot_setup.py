@@ -7,12 +7,25 @@ This script checks if everything is properly configured and identifies issues
 import sys
 import os
 import importlib
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 
 # Add the bot directory to Python path
 bot_dir = Path(__file__).parent
 sys.path.insert(0, str(bot_dir))
 
+@lru_cache(maxsize=4)
+def _compile_file(path, mtime_ns):
+    """Compile a source file; keyed on mtime so an edited file is recompiled"""
+    # compile() decodes bytes itself (UTF-8 unless the file declares otherwise)
+    with open(path, 'rb') as f:
+        return compile(f.read(), path, 'exec')
+
+def load_and_compile_bot(path='bot.py'):
+    """Return bot.py's code object, reading and compiling it at most once per version"""
+    return _compile_file(path, os.stat(path).st_mtime_ns)
+
 def check_dependencies():
     """Check if all required dependencies are installed"""
     print("🔍 Checking dependencies...")
@@ -159,7 +172,7 @@ def check_database():
             
             # Check tables
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall()]
+            tables = {row[0] for row in cursor.fetchall()}
             
             required_tables = ['users', 'posts', 'comments', 'reactions', 'reports', 'admin_messages']
             missing_tables = [table for table in required_tables if table not in tables]
@@ -169,11 +182,19 @@ def check_database():
             else:
                 print("  ✅ All required tables exist")
             
-            # Check table structures
+            # Check table structures; all three tables' columns in one query
+            cursor.execute("""
+                SELECT m.name, p.name
+                FROM sqlite_master m, pragma_table_info(m.name) p
+                WHERE m.type = 'table' AND m.name IN ('posts', 'comments', 'users')
+            """)
+            columns_by_table = defaultdict(set)
+            for table, column in cursor.fetchall():
+                columns_by_table[table].add(column)
+            
             for table in ['posts', 'comments', 'users']:
                 if table in tables:
-                    cursor.execute(f"PRAGMA table_info({table})")
-                    columns = [row[1] for row in cursor.fetchall()]
+                    columns = columns_by_table[table]
                     
                     if table == 'posts' and 'approved' not in columns:
                         print(f"  ⚠️  posts table missing 'approved' column")
@@ -196,11 +217,8 @@ def check_bot_syntax():
     print("\n🔍 Checking bot syntax...")
     
     try:
-        with open('bot.py', 'r', encoding='utf-8') as f:
-            bot_code = f.read()
-        
         # Try to compile the bot code
-        compile(bot_code, 'bot.py', 'exec')
+        load_and_compile_bot()
         print("  ✅ bot.py syntax is valid")
         return True
         
@@ -224,8 +242,12 @@ def check_file_structure():
     
     missing_files = []
     
+    # One directory listing instead of a stat() per file
+    with os.scandir('.') as entries:
+        present = {entry.name for entry in entries}
+    
     for file in required_files:
-        if os.path.exists(file):
+        if file in present:
             print(f"  ✅ {file}")
         else:
             missing_files.append(file)